@@ -1,24 +1,37 @@
 from dotenv import load_dotenv
-from openai import OpenAI
-import json
+from openai.types.chat import ChatCompletionMessageToolCall
 import os
-import requests
-from pypdf import PdfReader
+import time
 import gradio as gr
 from pydantic import BaseModel
+from prompts import chat_prefix, evaluator_prefix, rejection_message, summary_messages, profile_section, context_message, EXCERPTS_SECTION
+from retrieval import ProfileIndex
+from profile_cache import load_profile
+from notifier import Notifier
+from tool_registry import ToolRegistry
+from history import HistoryWindow, transcript
+from answer_cache import AnswerCache, content_hash
+from llm_clients import clients
 
 
 load_dotenv(override=True)
 
+notifier = Notifier.from_env()
+
+def merge_tool_call(tool_calls, call):
+    """ Add one streamed tool call fragment; names and arguments arrive in pieces, keyed by their index """
+    entry = tool_calls.setdefault(call.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+    if call.id:
+        entry["id"] = call.id
+    if call.function and call.function.name:
+        entry["function"]["name"] += call.function.name
+    if call.function and call.function.arguments:
+        entry["function"]["arguments"] += call.function.arguments
+
+
 def push(text):
-    requests.post(
-        "https://api.pushover.net/1/messages.json",
-        data={
-            "token": os.getenv("PUSHOVER_TOKEN"),
-            "user": os.getenv("PUSHOVER_USER"),
-            "message": text,
-        }
-    )
+    # Queued for the background worker so a slow Pushover call never delays the reply
+    notifier.send(text)
 
 
 def record_user_details(email, name="Name not provided", notes="not provided"):
@@ -70,8 +83,14 @@ record_unknown_question_json = {
     }
 }
 
-tools = [{"type": "function", "function": record_user_details_json},
-        {"type": "function", "function": record_unknown_question_json}]
+# Explicit registry instead of a globals() lookup: only these functions can be called by the model
+registry = ToolRegistry()
+registry.register(record_user_details, record_user_details_json)
+registry.register(record_unknown_question, record_unknown_question_json)
+
+tools = registry.specs()
+
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
 
 class Evaluation(BaseModel):
     is_acceptable: bool
@@ -79,135 +98,195 @@ class Evaluation(BaseModel):
 
 class Me:
 
-    def __init__(self):
-        self.openai = OpenAI()
-        self.gemini = OpenAI(api_key=os.getenv("GOOGLE_API_KEY"), base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
+    def __init__(self, openai=None, gemini=None):
+        start = time.perf_counter()
+        self.openai = openai or clients.openai()
+        self.gemini = gemini or clients.openai(base_url=GEMINI_BASE_URL, api_key=os.getenv("GOOGLE_API_KEY"), provider="gemini")
         self.name = "samson sahadevan"
-        reader = PdfReader("me/linkedin.pdf")
-        self.linkedin = ""
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                self.linkedin += text
+        # Reads the prebuilt me/linkedin.profile artifact; the PDF is only parsed when it has changed
+        self.linkedin, profile_source = load_profile("me/linkedin.pdf")
         with open("me/summary.txt", "r", encoding="utf-8") as f:
             self.summary = f.read()
+        profile_hash = content_hash("me/summary.txt", "me/linkedin.pdf")
+        # "full" sends the whole profile every turn; "retrieval" sends only the top-k BM25 excerpts for the question
+        self.context_mode = os.getenv("CONTEXT_MODE", "full")
+        if self.context_mode == "retrieval":
+            self.index = ProfileIndex.load_or_build(".cache/profile_index.json", profile_hash, {"summary": self.summary, "linkedin": self.linkedin})
+            profile = EXCERPTS_SECTION
+        else:
+            self.index = None
+            profile = profile_section(self.summary, self.linkedin)
+        # Built once per process; every turn reuses the same prefix strings
+        self.chat_prompt = chat_prefix(self.name, profile)
+        self.evaluator_prompt = evaluator_prefix(self.name, profile)
+        self.cache = None
+        if os.getenv("ANSWER_CACHE", "on") != "off":
+            self.cache = AnswerCache(".cache/answers.db", profile_hash, embed=self.embed)
+        self.history = HistoryWindow(self.summarize_turns, budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "4000")))
+        self.startup_seconds = time.perf_counter() - start
+        print(f"Me ready in {self.startup_seconds * 1000:.0f} ms (profile from {profile_source})", flush=True)
 
+    def embed(self, text):
+        response = self.openai.embeddings.create(model="text-embedding-3-small", input=text)
+        return response.data[0].embedding
+
+    def summarize_turns(self, summary, turns):
+        """ Extend the running summary with turns that have fallen out of the history window """
+        response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=summary_messages(summary, transcript(turns)))
+        return response.choices[0].message.content
+
+    def context(self, message):
+        if self.index is None:
+            return []
+        return [context_message(self.index.search(message, k=int(os.getenv("CONTEXT_TOP_K", "4"))))]
+
+    def turn_messages(self, history, message, *extra):
+        return self.chat_prompt.messages(self.history.apply(history), message, *self.context(message), *extra)
+
+    def cacheable(self, history):
+        # Only opening questions (the example buttons) are cached; later answers depend on the conversation
+        return self.cache is not None and not any(turn.get("role") == "user" for turn in history)
 
     def handle_tool_call(self, tool_calls):
-        results = []
-        for tool_call in tool_calls:
-            tool_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-            print(f"Tool called: {tool_name}", flush=True)
-            tool = globals().get(tool_name)
-            result = tool(**arguments) if tool else {}
-            results.append({"role": "tool","content": json.dumps(result),"tool_call_id": tool_call.id})
-        return results
+        return registry.dispatch(tool_calls)
     
     def system_prompt(self):
-        system_prompt = f"You are acting as {self.name}. You are answering questions on {self.name}'s website, \
-particularly questions related to {self.name}'s career, background, skills and experience. \
-Your responsibility is to represent {self.name} for interactions on the website as faithfully as possible. \
-You are given a summary of {self.name}'s background and LinkedIn profile which you can use to answer questions. \
-Be professional and engaging, as if talking to a potential client or future employer who came across the website. \
-If you don't know the answer to any question, use your record_unknown_question tool to record the question that you couldn't answer, even if it's about something trivial or unrelated to career. \
-If the user is engaging in discussion, try to steer them towards getting in touch via email; ask for their email and record it using your record_user_details tool. Keep the conversation in first person (like they are talking to {self.name}'s directly)"
-
-        system_prompt += f"\n\n## Summary:\n{self.summary}\n\n## LinkedIn Profile:\n{self.linkedin}\n\n"
-        system_prompt += f"With this context, please chat with the user, always staying in character as {self.name}."
-        return system_prompt
+        return self.chat_prompt.text
     
     def evaluator_system_prompt(self):
-        evaluator_system_prompt = f"You are an evaluator that decides whether a response to a question is acceptable. \
-You are provided with a conversation between a User and an Agent. Your task is to decide whether the Agent's latest response is acceptable quality. \
-The Agent is playing the role of {self.name} and is representing {self.name} on their website. \
-The Agent has been instructed to be professional and engaging, as if talking to a potential client or future employer who came across the website. \
-The Agent has been provided with context on {self.name} in the form of their summary and LinkedIn details. Here's the information:"
-
-        evaluator_system_prompt += f"\n\n## Summary:\n{self.summary}\n\n## LinkedIn Profile:\n{self.linkedin}\n\n"
-        evaluator_system_prompt += f"With this context, please evaluate the latest response, replying with whether the response is acceptable and your feedback."
-        return evaluator_system_prompt
+        return self.evaluator_prompt.text
+
     def evaluator_user_prompt(self, reply, message, history):
-        user_prompt = f"Here's the conversation between the User and the Agent: \n\n{history}\n\n"
+        user_prompt = f"Here's the conversation between the User and the Agent: \n\n{transcript(self.history.apply(history))}\n\n"
         user_prompt += f"Here's the latest message from the User: \n\n{message}\n\n"
         user_prompt += f"Here's the latest response from the Agent: \n\n{reply}\n\n"
+        for excerpt in self.context(message):
+            user_prompt += f"{excerpt['content']}\n\n"
         user_prompt += f"Please evaluate the response, replying with whether it is acceptable and your feedback."
         return user_prompt
     
     def evaluate(self, reply, message, history) -> Evaluation:
-        messages = [{"role": "system", "content": self.evaluator_system_prompt()}] + [{"role": "user", "content": self.evaluator_user_prompt(reply, message, history)}]
+        messages = [{"role": "system", "content": self.evaluator_prompt.text}, {"role": "user", "content": self.evaluator_user_prompt(reply, message, history)}]
         response = self.gemini.beta.chat.completions.parse(model="gemini-2.0-flash", messages=messages, response_format=Evaluation)
         return response.choices[0].message.parsed
     
     def rerun(self, reply, message, history, feedback):
-        updated_system_prompt = self.system_prompt() + f"\n\n## Previous answer rejected\nYou just tried to reply, but the quality control rejected your reply\n"
-        updated_system_prompt += f"## Your attempted answer:\n{reply}\n\n"
-        updated_system_prompt += f"## Reason for rejection:\n{feedback}\n\n"
-        messages = [{"role": "system", "content": updated_system_prompt}] + history + [{"role": "user", "content": message}]
-        response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages)
+        messages = self.turn_messages(history, message, rejection_message(reply, feedback))
+        response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, extra_body={"prompt_cache_key": self.chat_prompt.cache_key})
         return response.choices[0].message.content
     
     def chat(self, message, history):
-        messages = [{"role": "system", "content": self.system_prompt()}] + history + [{"role": "user", "content": message}]
+        cacheable = self.cacheable(history)
+        if cacheable and (cached := self.cache.get(message)):
+            return cached
+        messages = self.turn_messages(history, message)
         done = False
         while not done:
-            response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, tools=tools)
+            response = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, tools=tools, extra_body={"prompt_cache_key": self.chat_prompt.cache_key})
             if response.choices[0].finish_reason=="tool_calls":
-                message = response.choices[0].message
-                tool_calls = message.tool_calls
+                assistant_message = response.choices[0].message
+                tool_calls = assistant_message.tool_calls
                 results = self.handle_tool_call(tool_calls)
-                messages.append(message)
+                messages.append(assistant_message)
                 messages.extend(results)
+                cacheable = False
             else:
-                evaluation = self.evaluate(response.choices[0].message.content, message, history)
+                reply = response.choices[0].message.content
+                evaluation = self.evaluate(reply, message, history)
                 if evaluation.is_acceptable:
                     print ("Passed evaluation - returning reply")
-                    done = True
+                    if cacheable:
+                        self.cache.put(message, reply)
                 else:
                     print ("Failed evaluation - rerunning")
-                    reply = self.rerun(response.choices[0].message.content, message, history, evaluation.feedback)
-                    messages.append(message)
-                    messages.append({"role": "user", "content": reply})
+                    reply = self.rerun(reply, message, history, evaluation.feedback)
+                done = True
 
-        return response.choices[0].message.content
+        return reply
+
+    def stream_completion(self, messages, **kwargs):
+        """ Stream a completion, yielding the reply so far; returns (reply, tool_calls) when done """
+        stream = self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, stream=True, extra_body={"prompt_cache_key": self.chat_prompt.cache_key}, **kwargs)
+        reply = ""
+        tool_calls = {}
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                reply += delta.content
+                yield reply
+            for call in delta.tool_calls or []:
+                merge_tool_call(tool_calls, call)
+        return reply, [ChatCompletionMessageToolCall.model_validate(tool_calls[i]) for i in sorted(tool_calls)]
+
+    def chat_stream(self, message, history):
+        """ Streaming version of chat: tokens are shown as they arrive and the evaluator runs post-hoc """
+        cacheable = self.cacheable(history)
+        if cacheable and (cached := self.cache.get(message)):
+            yield cached
+            return
+        messages = self.turn_messages(history, message)
+        while True:
+            reply, tool_calls = yield from self.stream_completion(messages, tools=tools)
+            if not tool_calls:
+                break
+            cacheable = False
+            results = self.handle_tool_call(tool_calls)
+            messages.append({"role": "assistant", "content": reply or None, "tool_calls": [call.model_dump() for call in tool_calls]})
+            messages.extend(results)
+
+        evaluation = self.evaluate(reply, message, history)
+        if evaluation.is_acceptable:
+            print ("Passed evaluation - keeping streamed reply")
+            if cacheable:
+                self.cache.put(message, reply)
+            return
+        print ("Failed evaluation - replacing streamed reply")
+        # Each yield replaces the message in the chat window, so the rerun retracts the rejected reply as it streams
+        messages = self.turn_messages(history, message, rejection_message(reply, evaluation.feedback))
+        yield from self.stream_completion(messages)
     
 
+def build_ui(me, fn=None):
+    """ The visitor-facing chat UI; fn defaults to the streaming handler """
+    static_greeting = [
+        {
+            "role": "assistant",
+            "content": (
+                "Hi there! Samson here. How can I help you understand my experience and the value I can bring to your team?"
+            ),
+        }
+    ]
+
+    examples = [
+        ["Top career achievements"],        # ← 1‑item list works
+        ["AI projects & tech stack"],
+        ["Leadership style"],
+        ['Impact metrics']
+    ]
+
+    # ① Build a Chatbot that knows it will receive dicts, not tuples
+    chatbot = gr.Chatbot(
+        placeholder="👋 I’m Samson. Pick a topic below or ask anything",
+        type="messages",          # ← tell Gradio to expect role/content dicts
+        avatar_images=[
+                   "https://cdn-icons-png.flaticon.com/512/3177/3177440.png", "assets/samson.jpg"     # <-- add samson.jpg to your repo
+        ],
+    )
+
+    # ② Hand that Chatbot to ChatInterface
+    return gr.ChatInterface(
+            fn=fn or me.chat_stream,
+            type="messages",      # keeps the rest of the conversation in dict format
+            title="Samson Sahadevan",
+            description=(
+                "AI powered avatar—ask about my product leadership, AI work, and impact."
+            ),
+            examples=examples,
+            chatbot=chatbot
+    )
+
+
 if __name__ == "__main__":
-    me = Me()
-static_greeting = [
-    {
-        "role": "assistant",
-        "content": (
-            "Hi there! Samson here. How can I help you understand my experience and the value I can bring to your team?"
-        ),
-    }
-]
-
-examples = [
-    ["Top career achievements"],        # ← 1‑item list works
-    ["AI projects & tech stack"],
-    ["Leadership style"],
-    ['Impact metrics']
-]
-
-# ① Build a Chatbot that knows it will receive dicts, not tuples
-chatbot = gr.Chatbot(
-    placeholder="👋 I’m Samson. Pick a topic below or ask anything",
-    type="messages",          # ← tell Gradio to expect role/content dicts
-    avatar_images=[
-               "https://cdn-icons-png.flaticon.com/512/3177/3177440.png", "assets/samson.jpg"     # <-- add samson.jpg to your repo
-    ],
-)
-
-# ② Hand that Chatbot to ChatInterface
-gr.ChatInterface(
-        fn=me.chat,
-        type="messages",      # keeps the rest of the conversation in dict format
-        title="Samson Sahadevan",
-        description=(
-            "AI powered avatar—ask about my product leadership, AI work, and impact."
-        ),
-        examples=examples,
-        chatbot=chatbot
-).launch()
-    
\ No newline at end of file
+    build_ui(Me()).launch()
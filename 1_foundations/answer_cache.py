@@ -0,0 +1,137 @@
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+
+
+def normalize_question(question: str) -> str:
+    """ Lowercase, drop punctuation and collapse whitespace so trivially different questions share a key """
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(question.split())
+
+
+def content_hash(*paths) -> str:
+    """ Hash of the profile source files; any edit to them invalidates the cache """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def _unit(vector):
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array("f", (x / norm for x in vector))
+
+
+class AnswerCache:
+    """ SQLite-backed answer cache with exact and embedding-similarity lookup, TTL and LRU eviction
+
+    The cache is best-effort: a failed embedding call falls back to exact matching, and a database
+    error is logged and treated as a miss, so the cache never fails a turn.
+    """
+
+    def __init__(self, path, profile_hash, embed=None, ttl=7 * 24 * 3600, max_entries=200, threshold=0.92):
+        self.path = str(path)
+        self.profile_hash = profile_hash
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        # Memoised so a miss followed by a put only pays for one embedding call
+        self.embed = lru_cache(maxsize=256)(embed) if embed else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(answers)")}
+            if columns and "profile_hash" not in columns:
+                # Caches written before rows carried their profile version; they are only a cache, so start over
+                conn.execute("DROP TABLE answers")
+                conn.execute("DROP TABLE IF EXISTS meta")
+            # Rows are keyed by profile version, so workers on old and new profiles can share the file during a rollout
+            conn.execute("""CREATE TABLE IF NOT EXISTS answers (
+                key TEXT, profile_hash TEXT, question TEXT, answer TEXT, embedding BLOB,
+                created REAL, last_used REAL, hits INTEGER DEFAULT 0, PRIMARY KEY (key, profile_hash))""")
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=10, isolation_level=None))
+
+    def _vector(self, key):
+        """ Unit embedding of key, or None without an embedder or when the call fails """
+        if not self.embed:
+            return None
+        try:
+            return _unit(self.embed(key))
+        except Exception as e:
+            print(f"Answer cache embedding failed, using exact match only: {e}", flush=True)
+            return None
+
+    def get(self, question) -> str | None:
+        try:
+            answer = self._lookup(normalize_question(question), time.time())
+        except sqlite3.Error as e:
+            print(f"Answer cache lookup failed: {e}", flush=True)
+            answer = None
+        if answer is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return answer
+
+    def _lookup(self, key, now):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT key, answer FROM answers WHERE key = ? AND profile_hash = ? AND created > ?",
+                               (key, self.profile_hash, now - self.ttl)).fetchone()
+        if row is None and self.embed:
+            # The embedding call is a network round trip; make it without holding the lock or a connection
+            target = self._vector(key)
+            if target is not None:
+                with self._lock, self._connect() as conn:
+                    row = self._nearest(conn, target, now)
+        if row is None:
+            return None
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE answers SET last_used = ?, hits = hits + 1 WHERE key = ? AND profile_hash = ?",
+                         (now, row[0], self.profile_hash))
+        return row[1]
+
+    def _nearest(self, conn, target, now):
+        best, best_score = None, self.threshold
+        for row_key, answer, blob in conn.execute("SELECT key, answer, embedding FROM answers WHERE embedding IS NOT NULL AND profile_hash = ? AND created > ?",
+                                                  (self.profile_hash, now - self.ttl)):
+            vector = array("f")
+            vector.frombytes(blob)
+            score = sum(a * b for a, b in zip(target, vector))
+            if score >= best_score:
+                best, best_score = (row_key, answer), score
+        return best
+
+    def put(self, question, answer):
+        key = normalize_question(question)
+        now = time.time()
+        vector = self._vector(key)
+        blob = vector.tobytes() if vector is not None else None
+        try:
+            self._store(key, question, answer, blob, now)
+        except sqlite3.Error as e:
+            print(f"Answer cache write failed: {e}", flush=True)
+
+    def _store(self, key, question, answer, blob, now):
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO answers (key, profile_hash, question, answer, embedding, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, self.profile_hash, question, answer, blob, now, now))
+            conn.execute("DELETE FROM answers WHERE created <= ?", (now - self.ttl,))
+            # Rows of a retired profile are never used again, so they fall out of the LRU order first
+            conn.execute("""DELETE FROM answers WHERE rowid IN (
+                SELECT rowid FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM answers")
@@ -0,0 +1,183 @@
+import asyncio
+import os
+from dataclasses import dataclass
+import gradio as gr
+from openai.types.chat import ChatCompletionMessageToolCall
+from ai_resume_app import Me, Evaluation, GEMINI_BASE_URL, merge_tool_call, tools
+from prompts import rejection_message, summary_messages
+from history import transcript
+from llm_clients import clients
+
+
+@dataclass
+class GateStats:
+    """ How often the evaluator gate actually changes anything """
+    evaluated: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    errors: int = 0
+    reruns: int = 0
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.evaluated if self.evaluated else 0.0
+
+    def report(self) -> str:
+        return (f"Evaluator gate: {self.evaluated} evaluated, {self.rejected} rejected ({self.rejection_rate:.1%}), "
+                f"{self.reruns} reruns, {self.timed_out} over budget, {self.errors} errors")
+
+
+class AsyncMe(Me):
+    """ Async variant of Me: the reply is returned without waiting on the evaluator
+
+    mode="audit" runs evaluate() in the background and only logs the verdict.
+    mode="race" waits up to eval_budget seconds for the verdict and reruns on a rejection;
+    a slower verdict is still recorded in the stats once it arrives.
+    """
+
+    def __init__(self, mode=None, eval_budget=None):
+        # The answer cache and history summaries run in worker threads, so they use a sync client
+        self.sync_openai = clients.openai()
+        super().__init__(
+            openai=clients.async_openai(),
+            gemini=clients.async_openai(base_url=GEMINI_BASE_URL, api_key=os.getenv("GOOGLE_API_KEY"), provider="gemini"),
+        )
+        self.mode = mode or os.getenv("EVAL_MODE", "audit")
+        self.eval_budget = eval_budget if eval_budget is not None else float(os.getenv("EVAL_BUDGET", "1.5"))
+        self.stats = GateStats()
+        self._background = set()
+
+    def embed(self, text):
+        response = self.sync_openai.embeddings.create(model="text-embedding-3-small", input=text)
+        return response.data[0].embedding
+
+    def summarize_turns(self, summary, turns):
+        response = self.sync_openai.chat.completions.create(model="gpt-4o-mini", messages=summary_messages(summary, transcript(turns)))
+        return response.choices[0].message.content
+
+    async def evaluate(self, reply, message, history) -> Evaluation:
+        user_prompt = await asyncio.to_thread(self.evaluator_user_prompt, reply, message, history)
+        messages = [{"role": "system", "content": self.evaluator_prompt.text}, {"role": "user", "content": user_prompt}]
+        response = await self.gemini.beta.chat.completions.parse(model="gemini-2.0-flash", messages=messages, response_format=Evaluation)
+        return response.choices[0].message.parsed
+
+    async def audit(self, reply, message, history, cacheable=False) -> Evaluation | None:
+        """ Evaluate a reply and record the verdict, never raising """
+        try:
+            evaluation = await self.evaluate(reply, message, history)
+        except Exception as e:
+            self.stats.errors += 1
+            print(f"Evaluator error: {e}", flush=True)
+            return None
+        self.stats.evaluated += 1
+        if not evaluation.is_acceptable:
+            self.stats.rejected += 1
+            print(f"Evaluator rejected a reply: {evaluation.feedback}", flush=True)
+        elif cacheable:
+            await asyncio.to_thread(self.cache.put, message, reply)
+        if self.stats.evaluated % 20 == 0:
+            print(self.stats.report(), flush=True)
+        return evaluation
+
+    def in_background(self, coro):
+        # Hold a reference so the task is not garbage collected before it finishes
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def rerun(self, reply, message, history, feedback):
+        messages = await asyncio.to_thread(self.turn_messages, history, message, rejection_message(reply, feedback))
+        response = await self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, extra_body={"prompt_cache_key": self.chat_prompt.cache_key})
+        return response.choices[0].message.content
+
+    async def chat(self, message, history):
+        cacheable = self.cacheable(history)
+        if cacheable and (cached := await asyncio.to_thread(self.cache.get, message)):
+            return cached
+        # History windowing may call the summarizer, so keep it off the event loop
+        messages = await asyncio.to_thread(self.turn_messages, history, message)
+        while True:
+            response = await self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, tools=tools, extra_body={"prompt_cache_key": self.chat_prompt.cache_key})
+            if response.choices[0].finish_reason != "tool_calls":
+                break
+            assistant_message = response.choices[0].message
+            results = await asyncio.to_thread(self.handle_tool_call, assistant_message.tool_calls)
+            messages.append(assistant_message)
+            messages.extend(results)
+            cacheable = False
+
+        reply = response.choices[0].message.content
+        audit = self.in_background(self.audit(reply, message, history, cacheable))
+        if self.mode != "race":
+            return reply
+
+        try:
+            evaluation = await asyncio.wait_for(asyncio.shield(audit), timeout=self.eval_budget)
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            print("Evaluator over budget - returning unchecked reply", flush=True)
+            return reply
+        if evaluation is None or evaluation.is_acceptable:
+            return reply
+        print("Failed evaluation - rerunning", flush=True)
+        self.stats.reruns += 1
+        return await self.rerun(reply, message, history, evaluation.feedback)
+
+    async def stream_completion(self, messages, result, **kwargs):
+        """ Stream a completion on the async client, yielding the reply so far; leaves (reply, tool_calls) in result["done"] """
+        stream = await self.openai.chat.completions.create(model="gpt-4o-mini", messages=messages, stream=True, extra_body={"prompt_cache_key": self.chat_prompt.cache_key}, **kwargs)
+        reply = ""
+        tool_calls = {}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                reply += delta.content
+                yield reply
+            for call in delta.tool_calls or []:
+                merge_tool_call(tool_calls, call)
+        result["done"] = reply, [ChatCompletionMessageToolCall.model_validate(tool_calls[i]) for i in sorted(tool_calls)]
+
+    async def chat_stream(self, message, history):
+        """ Streaming version of chat: tokens are shown as they arrive and the evaluator gate follows self.mode """
+        cacheable = self.cacheable(history)
+        if cacheable and (cached := await asyncio.to_thread(self.cache.get, message)):
+            yield cached
+            return
+        messages = await asyncio.to_thread(self.turn_messages, history, message)
+        while True:
+            result = {}
+            async for reply in self.stream_completion(messages, result, tools=tools):
+                yield reply
+            reply, tool_calls = result["done"]
+            if not tool_calls:
+                break
+            cacheable = False
+            results = await asyncio.to_thread(self.handle_tool_call, tool_calls)
+            messages.append({"role": "assistant", "content": reply or None, "tool_calls": [call.model_dump() for call in tool_calls]})
+            messages.extend(results)
+
+        audit = self.in_background(self.audit(reply, message, history, cacheable))
+        if self.mode != "race":
+            return
+        try:
+            evaluation = await asyncio.wait_for(asyncio.shield(audit), timeout=self.eval_budget)
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            print("Evaluator over budget - keeping unchecked reply", flush=True)
+            return
+        if evaluation is None or evaluation.is_acceptable:
+            return
+        print("Failed evaluation - replacing streamed reply", flush=True)
+        self.stats.reruns += 1
+        # Each yield replaces the message in the chat window, so the rerun retracts the rejected reply as it streams
+        messages = await asyncio.to_thread(self.turn_messages, history, message, rejection_message(reply, evaluation.feedback))
+        async for reply in self.stream_completion(messages, {}):
+            yield reply
+
+
+if __name__ == "__main__":
+    me = AsyncMe()
+    gr.ChatInterface(me.chat_stream, type="messages", title="Samson Sahadevan").launch()
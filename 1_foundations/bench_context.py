@@ -0,0 +1,67 @@
+""" Compare prompt size and latency per turn for CONTEXT_MODE=full vs CONTEXT_MODE=retrieval
+
+    python bench_context.py           # offline: tokens per turn and prompt assembly time
+    python bench_context.py --live    # also time real chat() round trips (uses API credits)
+"""
+import argparse
+import os
+import statistics
+import time
+from history import count_tokens
+
+QUESTIONS = [
+    "Top career achievements",
+    "AI projects & tech stack",
+    "Leadership style",
+    "Impact metrics",
+    "Where did you study?",
+    "What did you do before product management?",
+    "Have you worked with large language models in production?",
+    "Hi there!",
+]
+
+
+def prompt_tokens(messages):
+    return sum(count_tokens(m["content"]) for m in messages if isinstance(m, dict) and m.get("content"))
+
+
+def bench_mode(mode, live):
+    os.environ["CONTEXT_MODE"] = mode
+    os.environ["ANSWER_CACHE"] = "off"
+    from ai_resume_app import Me
+    start = time.perf_counter()
+    me = Me()
+    init_time = time.perf_counter() - start
+
+    chat_tokens, eval_tokens, assembly, latency = [], [], [], []
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        messages = me.turn_messages([], question)
+        evaluator = me.evaluator_prompt.text + me.evaluator_user_prompt("A typical two paragraph reply.", question, [])
+        assembly.append(time.perf_counter() - start)
+        chat_tokens.append(prompt_tokens(messages))
+        eval_tokens.append(count_tokens(evaluator))
+        if live:
+            start = time.perf_counter()
+            me.chat(question, [])
+            latency.append(time.perf_counter() - start)
+
+    print(f"\n== {mode} ==")
+    print(f"startup:                {init_time * 1000:8.1f} ms")
+    print(f"chat tokens / turn:     {statistics.mean(chat_tokens):8.0f}")
+    print(f"evaluator tokens / turn:{statistics.mean(eval_tokens):8.0f}")
+    print(f"prompt assembly:        {statistics.mean(assembly) * 1e6:8.1f} us")
+    if latency:
+        print(f"chat latency p50:       {statistics.median(latency):8.2f} s")
+    return statistics.mean(chat_tokens) + statistics.mean(eval_tokens)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="time real chat() calls against the APIs")
+    args = parser.parse_args()
+    if not args.live:
+        os.environ.setdefault("OPENAI_API_KEY", "offline")
+    full = bench_mode("full", args.live)
+    retrieval = bench_mode("retrieval", args.live)
+    print(f"\nretrieval sends {1 - retrieval / full:.0%} fewer input tokens per turn")
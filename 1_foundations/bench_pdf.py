@@ -0,0 +1,65 @@
+""" Benchmark pdf_pages against a plain serial extraction on a 50-page PDF
+
+    python bench_pdf.py                   # builds a 50-page PDF from me/linkedin.pdf
+    python bench_pdf.py --pdf big.pdf --engine pdfplumber --workers 4
+
+Reports total time, time to the first page (when prompt building could start), and a rerun
+served from the per-page cache.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pypdf import PdfReader, PdfWriter
+from pdf_pages import extract_range, iter_pages, page_count
+
+
+def build_pdf(source, pages, out):
+    reader = PdfReader(source)
+    writer = PdfWriter()
+    for i in range(pages):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    with open(out, "wb") as f:
+        writer.write(f)
+
+
+def timed_pages(run):
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in run():
+        count += 1
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="PDF to extract; default builds one from --source")
+    parser.add_argument("--source", default="me/linkedin.pdf")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--engine", default="pypdf", choices=["pypdf", "pdfplumber"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf or os.path.join(tmp, "bench.pdf")
+        if not args.pdf:
+            build_pdf(args.source, args.pages, pdf)
+        total = page_count(pdf, args.engine)
+        cache = os.path.join(tmp, "cache")
+        print(f"{pdf}: {total} pages, engine {args.engine}, {args.workers} workers", flush=True)
+
+        runs = [
+            ("serial, whole document", lambda: extract_range(pdf, args.engine, range(total))),
+            ("iter_pages, in-process", lambda: iter_pages(pdf, args.engine, cache_dir=None, pool_from=total + 1)),
+            ("iter_pages, process pool", lambda: iter_pages(pdf, args.engine, cache_dir=cache, pool_from=1, workers=args.workers)),
+            ("iter_pages, page cache", lambda: iter_pages(pdf, args.engine, cache_dir=cache)),
+        ]
+        for name, run in runs:
+            first, elapsed, count = timed_pages(run)
+            # The serial baseline has nothing to show until every page is parsed
+            if name.startswith("serial"):
+                first = elapsed
+            print(f"{name:<26} total {elapsed * 1000:8.1f} ms   first page {first * 1000:8.1f} ms   ({count} pages)", flush=True)
@@ -0,0 +1,88 @@
+""" Throughput of serve.py against a fake LLM backend as the worker count grows
+
+    python bench_workers.py --workers 1 2 4 --clients 32 --requests 200
+
+For each worker count it starts fake_llm_server.py and serve.py, sends --requests POST /api/chat
+calls from --clients concurrent clients spread round-robin over the worker ports, and reports
+requests per second and latency percentiles. Nothing leaves the machine.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_until_up(url, timeout=90):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urlopen(url, timeout=2).read()
+            return
+        except (URLError, OSError):
+            time.sleep(0.3)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def post(url, message):
+    body = json.dumps({"message": message, "history": []}).encode("utf-8")
+    start = time.perf_counter()
+    urlopen(Request(url, data=body, headers={"Content-Type": "application/json"}), timeout=120).read()
+    return time.perf_counter() - start
+
+
+def bench(workers, args, env):
+    server = subprocess.Popen([sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(args.port)], cwd=HERE, env=env)
+    try:
+        ports = [args.port + i for i in range(workers)]
+        for port in ports:
+            wait_until_up(f"http://127.0.0.1:{port}/healthz")
+        urls = itertools.cycle(f"http://127.0.0.1:{port}/api/chat" for port in ports)
+        jobs = [(next(urls), f"Question {i} about leadership") for i in range(args.requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = list(pool.map(lambda job: post(*job), jobs))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {"workers": workers, "throughput": len(jobs) / elapsed, "p50": statistics.median(latencies),
+            "p95": latencies[int(0.95 * (len(latencies) - 1))]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM seconds per call")
+    parser.add_argument("--concurrency", type=int, default=4, help="MAX_CONCURRENCY per worker")
+    parser.add_argument("--port", type=int, default=7960)
+    parser.add_argument("--llm-port", type=int, default=8900)
+    args = parser.parse_args()
+
+    llm = subprocess.Popen([sys.executable, "fake_llm_server.py", "--port", str(args.llm_port), "--latency", str(args.latency),
+                            "--tool-call-rate", "0", "--eval-fail-rate", "0.1"], cwd=HERE)
+    base_url = f"http://127.0.0.1:{args.llm_port}/v1"
+    env = dict(os.environ, OPENAI_BASE_URL=base_url, GEMINI_BASE_URL=base_url, OPENAI_API_KEY="fake", GOOGLE_API_KEY="fake",
+               PUSHOVER_URL=base_url + "/push", ANSWER_CACHE="off", RATE_LIMIT="1000000", MAX_CONCURRENCY=str(args.concurrency))
+    try:
+        wait_until_up(base_url + "/stats")
+        results = [bench(workers, args, env) for workers in args.workers]
+    finally:
+        llm.terminate()
+        llm.wait()
+
+    baseline = results[0]["throughput"]
+    print(f"\n{'workers':>7}  {'req/s':>7}  {'speedup':>7}  {'p50 s':>6}  {'p95 s':>6}")
+    for r in results:
+        print(f"{r['workers']:>7}  {r['throughput']:>7.2f}  {r['throughput'] / baseline:>6.2f}x  {r['p50']:>6.2f}  {r['p95']:>6.2f}")
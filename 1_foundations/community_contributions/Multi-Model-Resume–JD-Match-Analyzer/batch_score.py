@@ -0,0 +1,149 @@
+"""
+Score every resume in one directory against every job description in another.
+
+    python batch_score.py resumes/ jds/ --out results.csv --matrix matrix.parquet
+    python batch_score.py resumes/ jds/ --mock --concurrency 16      # local mock models, no API keys
+
+Each (resume, JD, model) score is appended to --out as soon as it arrives. Rerunning the same
+command skips the pairs already in --out, so an interrupted run picks up where it stopped. At the
+end the average score per resume and JD is written to --matrix (.csv or .parquet).
+"""
+import argparse
+import asyncio
+import csv
+import os
+import time
+import pandas as pd
+from dotenv import load_dotenv
+from documents import load_documents
+from fanout import ask, clients, default_providers, mock_providers
+from resume_prompt import build_prompt
+
+FIELDS = ["resume", "jd", "provider", "score", "error", "resume_sha256", "jd_sha256"]
+
+
+def completed_pairs(out_path):
+    """ (resume hash, JD hash, provider) for every score already written by an earlier run """
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, newline="", encoding="utf-8") as f:
+        return {(row["resume_sha256"], row["jd_sha256"], row["provider"]) for row in csv.DictReader(f) if row["score"]}
+
+
+class RateLimit:
+    """ Spaces requests to one provider at least 60 / per_minute seconds apart """
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def score_all(resumes, jds, providers, out_path, concurrency=8, per_minute=60, keep=None):
+    """
+    Score every missing (resume, JD, provider) combination with at most `concurrency` calls in flight.
+
+    `keep` is an optional (JD, resume) boolean mask from prefilter.shortlist; pairs outside it are not scored.
+    """
+    done = completed_pairs(out_path)
+    limits = {provider.name: RateLimit(per_minute) for provider in providers}
+    work = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"scored": 0, "failed": 0, "skipped": 0, "filtered": 0}
+
+    with open(out_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if f.tell() == 0:
+            writer.writeheader()
+            f.flush()
+
+        async def worker():
+            while (item := await work.get()) is not None:
+                resume, jd, provider, prompt = item
+                await limits[provider.name].wait()
+                result = await ask(provider, prompt)
+                writer.writerow({"resume": resume["name"], "jd": jd["name"], "provider": provider.name,
+                                 "score": "" if result.score is None else result.score, "error": result.error or "",
+                                 "resume_sha256": resume["sha256"], "jd_sha256": jd["sha256"]})
+                # Flush per row so an interrupted run loses nothing already paid for
+                f.flush()
+                counts["scored" if result.error is None else "failed"] += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for r, resume in enumerate(resumes):
+            for j, jd in enumerate(jds):
+                if keep is not None and not keep[j, r]:
+                    counts["filtered"] += len(providers)
+                    continue
+                prompt = build_prompt(resume["text"], jd["text"])
+                for provider in providers:
+                    key = (resume["sha256"], jd["sha256"], provider.name)
+                    # Also catches identical files under different names within this run
+                    if key in done:
+                        counts["skipped"] += 1
+                        continue
+                    done.add(key)
+                    await work.put((resume, jd, provider, prompt))
+        for _ in workers:
+            await work.put(None)
+        await asyncio.gather(*workers)
+    return counts
+
+
+def write_matrix(out_path, matrix_path, resumes, jds):
+    """ Average score per resume (rows) and JD (columns), from the latest score of each model """
+    rows = pd.read_csv(out_path, dtype={"score": "float"}).dropna(subset=["score"])
+    rows = rows.drop_duplicates(subset=["resume_sha256", "jd_sha256", "provider"], keep="last")
+    by_hash = rows.pivot_table(index="resume_sha256", columns="jd_sha256", values="score", aggfunc="mean")
+    # Scores are stored by content, so files that were renamed or duplicated still get theirs
+    matrix = by_hash.reindex(index=[r["sha256"] for r in resumes], columns=[j["sha256"] for j in jds]).round(2)
+    matrix.index = pd.Index([r["name"] for r in resumes], name="resume")
+    matrix.columns = pd.Index([j["name"] for j in jds], name="jd")
+    if matrix_path.endswith(".parquet"):
+        matrix.to_parquet(matrix_path)
+    else:
+        matrix.to_csv(matrix_path)
+    return matrix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("resumes", help="directory of resumes")
+    parser.add_argument("jds", help="directory of job descriptions")
+    parser.add_argument("--out", default="batch_results.csv", help="one row per (resume, JD, model); appended to and resumed from")
+    parser.add_argument("--matrix", default="batch_matrix.csv", help="resume x JD average scores, .csv or .parquet")
+    parser.add_argument("--cache-dir", default=".cache/text", help="extracted text, keyed by file SHA-256")
+    parser.add_argument("--concurrency", type=int, default=8, help="provider calls in flight at once")
+    parser.add_argument("--per-minute", type=float, default=60, help="requests per minute to each provider")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top-k", type=int, help="only score the k resumes most similar to each JD (TF-IDF prefilter)")
+    parser.add_argument("--min-similarity", type=float, default=0.0, help="skip pairs below this TF-IDF similarity")
+    parser.add_argument("--mock", action="store_true", help="use local mock models with injected latency")
+    args = parser.parse_args()
+
+    load_dotenv(override=True)
+    start = time.perf_counter()
+    resumes = load_documents(args.resumes, args.cache_dir)
+    jds = load_documents(args.jds, args.cache_dir)
+    print(f"{len(resumes)} resumes x {len(jds)} JDs, text ready in {time.perf_counter() - start:.1f}s", flush=True)
+
+    providers = mock_providers(timeout=args.timeout) if args.mock else default_providers(timeout=args.timeout)
+    keep = None
+    if args.top_k is not None or args.min_similarity > 0:
+        # Only the prefilter needs scikit-learn, so plain batch runs work without it
+        from prefilter import shortlist, similarity
+        keep = shortlist(similarity([jd["text"] for jd in jds], [resume["text"] for resume in resumes]), args.top_k, args.min_similarity)
+    # clients.run closes the pooled async clients before the loop ends
+    counts = clients.run(score_all(resumes, jds, providers, args.out, args.concurrency, args.per_minute, keep))
+    print(f"scored {counts['scored']}, failed {counts['failed']}, already done {counts['skipped']}, "
+          f"prefiltered out {counts['filtered']} "
+          f"in {time.perf_counter() - start:.1f}s", flush=True)
+    matrix = write_matrix(args.out, args.matrix, resumes, jds)
+    print(f"wrote {args.out} and {args.matrix} ({matrix.shape[0]} x {matrix.shape[1]})", flush=True)
@@ -0,0 +1,60 @@
+import re
+
+# Words that appear on a resume's first lines but are never part of a name
+NOT_NAME_WORDS = {
+    "resume", "curriculum", "vitae", "cv", "profile", "summary", "objective", "experience", "education", "skills",
+    "contact", "email", "phone", "address", "linkedin", "github", "portfolio", "references", "projects",
+    "engineer", "developer", "manager", "analyst", "scientist", "designer", "consultant", "director", "lead",
+    "senior", "junior", "intern", "software", "data", "product", "full", "stack", "and", "of", "the", "at",
+    "work", "history", "employment", "professional", "career", "certifications", "languages", "interests", "highlights",
+}
+NAME_WORD = re.compile(r"^[A-Z][a-zA-Z'\-]*\.?$|^[A-Z]{2,}$")
+LABELLED = re.compile(r"^\s*(?:full\s+)?name\s*[:\-]\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+# "San Francisco, CA" or "Austin, Texas": a place, not a person
+LOCATION = re.compile(r",\s*(?:[A-Z]{2}|[A-Z][a-z]+)$")
+EMAIL = re.compile(r"([A-Za-z0-9._%+\-]+)@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+
+
+def looks_like_name(line):
+    words = line.split()
+    if not 2 <= len(words) <= 4 or LOCATION.search(line):
+        return False
+    if any(word.lower().strip(".,") in NOT_NAME_WORDS for word in words):
+        return False
+    return all(NAME_WORD.match(word.strip(",")) for word in words)
+
+
+def tidy(line):
+    name = " ".join(word.strip(",") for word in line.split())
+    return name.title() if name.isupper() else name
+
+
+def guess_name(resume_text, max_lines=8):
+    """
+    Find the candidate's name without an LLM.
+
+    Returns:
+        Tuple[str, float]: The name (or None) and a confidence between 0 and 1.
+    """
+    match = LABELLED.search(resume_text)
+    if match and looks_like_name(match.group(1).strip()):
+        return tidy(match.group(1).strip()), 0.95
+
+    email = EMAIL.search(resume_text)
+    email_parts = set(re.split(r"[._\-+0-9]+", email.group(1).lower())) if email else set()
+
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()][:max_lines]
+    candidates = []
+    for line in lines:
+        # Names are often followed by contact details on the same line
+        line = re.split(r"\s[|•·]\s|\s{3,}|\t", line)[0].strip()
+        if looks_like_name(line):
+            candidates.append(tidy(line))
+    # The email address spelling out part of the name is strong corroboration
+    for name in candidates:
+        if email_parts & {word.lower().strip(".") for word in name.split()}:
+            return name, 0.9
+    if candidates:
+        # Uncorroborated guesses stay below the caller's cutoff, so an LLM gets the final say
+        return candidates[0], 0.6
+    return None, 0.0
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+# pdf_pages is shared with the 1_foundations apps
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import pdf_pages
+
+PAGE_CACHE = ".cache/pdf_pages"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_file_text(path):
+    if path.lower().endswith(".pdf"):
+        # Pages are parsed in parallel for long PDFs and cached by file hash
+        return pdf_pages.extract_text(path, engine="pdfplumber", cache_dir=PAGE_CACHE)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def load_documents(directory, cache_dir):
+    """
+    Extract the text of every file in a directory, once per distinct file content.
+
+    Returns:
+        List[dict]: {"name", "sha256", "text"} per file, in name order.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or name.startswith("."):
+            continue
+        sha = file_sha256(path)
+        cached = os.path.join(cache_dir, f"{sha}.txt")
+        if os.path.exists(cached):
+            with open(cached, "r", encoding="utf-8") as f:
+                text = f.read()
+        else:
+            text = extract_file_text(path)
+            with open(cached + ".tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(cached + ".tmp", cached)
+        documents.append({"name": name, "sha256": sha, "text": text})
+    return documents
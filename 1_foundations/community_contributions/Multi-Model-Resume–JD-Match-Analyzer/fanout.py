@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import atexit
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+# Shared long-lived clients from 1_foundations/llm_clients.py
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from llm_clients import clients
+
+SYSTEM_PROMPT = "You are a professional resume evaluator."
+
+
+@dataclass
+class Provider:
+    """
+    One model to ask for a match score.
+
+    Args:
+        name (str): Label shown in the results table.
+        call: Async function taking the prompt and returning the model's raw answer.
+        timeout (float): Seconds to wait for an answer, hedges included.
+        hedge_after (float): Seconds after which a duplicate request is sent if there is
+            no answer yet; the first of the two to answer wins. None disables hedging.
+        model (str): Model identifier, used to key cached scores.
+    """
+    name: str
+    call: Callable[[str], Awaitable[str]]
+    timeout: float = 30.0
+    hedge_after: Optional[float] = None
+    model: str = ""
+
+
+@dataclass
+class Result:
+    name: str
+    score: Optional[int] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    hedged: bool = False
+    cached: bool = False
+
+
+def parse_score(content):
+    digits = ''.join(filter(str.isdigit, content or ""))
+    return min(int(digits), 100) if digits else 0
+
+
+def openai_compatible(model, api_key=None, base_url=None, system=True):
+    async def call(prompt):
+        # One client per provider per event loop, so hedges and batch jobs reuse connections
+        client = clients.async_openai(base_url=base_url, api_key=api_key)
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        response = await client.chat.completions.create(model=model, messages=messages)
+        return response.choices[0].message.content
+    return call
+
+
+def anthropic(model, max_tokens=100):
+    async def call(prompt):
+        client = clients.async_anthropic()
+        message = await client.messages.create(model=model, max_tokens=max_tokens, messages=[{"role": "user", "content": prompt}])
+        return message.content[0].text
+    return call
+
+
+def default_providers(timeout=30.0, hedge_after=None):
+    """ The five models the analyzer compares, configured from the usual API key environment variables """
+    models = [
+        ("OpenAI GPT-4o Mini", "gpt-4o-mini", openai_compatible("gpt-4o-mini")),
+        ("Anthropic Claude", "claude-3-7-sonnet-latest", anthropic("claude-3-7-sonnet-latest")),
+        ("Google Gemini", "gemini-2.0-flash", openai_compatible("gemini-2.0-flash", os.getenv("GOOGLE_API_KEY"),
+                                                                "https://generativelanguage.googleapis.com/v1beta/openai/", system=False)),
+        ("Groq", "llama-3.3-70b-versatile", openai_compatible("llama-3.3-70b-versatile", os.getenv("GROQ_API_KEY"),
+                                                              "https://api.groq.com/openai/v1", system=False)),
+        ("DeepSeek", "deepseek-chat", openai_compatible("deepseek-chat", os.getenv("DEEPSEEK_API_KEY"),
+                                                        "https://api.deepseek.com/v1", system=False)),
+    ]
+    return [Provider(name, call, timeout, hedge_after, model) for name, model, call in models]
+
+
+def mock_providers(latencies=None, slow_rate=0.2, slow_factor=5.0, fail_rate=0.0, seed=None, timeout=30.0, hedge_after=None):
+    """
+    Providers that answer locally after an injected delay, for testing without API keys.
+
+    Each request sleeps around the provider's latency; with probability `slow_rate` it is
+    `slow_factor` times slower (the tail that hedging is meant to cut), and with probability
+    `fail_rate` it raises instead of answering.
+    """
+    latencies = latencies or {"OpenAI GPT-4o Mini": 0.8, "Anthropic Claude": 1.2, "Google Gemini": 0.6, "Groq": 0.3, "DeepSeek": 1.5}
+    rng = random.Random(seed)
+
+    def mock(name, latency):
+        async def call(prompt):
+            delay = latency * rng.uniform(0.8, 1.2) * (slow_factor if rng.random() < slow_rate else 1)
+            await asyncio.sleep(delay)
+            if rng.random() < fail_rate:
+                raise RuntimeError(f"{name} mock failure")
+            return str(50 + zlib.crc32(f"{name}:{prompt}".encode("utf-8")) % 50)
+        return call
+
+    return [Provider(name, mock(name, latency), timeout, hedge_after, model="mock") for name, latency in latencies.items()]
+
+
+async def ask(provider, prompt):
+    """ Ask one provider, hedging and timing out as configured; never raises """
+    start = time.perf_counter()
+    attempts = [asyncio.create_task(provider.call(prompt))]
+    error = None
+    try:
+        async with asyncio.timeout(provider.timeout):
+            if provider.hedge_after is not None:
+                done, _ = await asyncio.wait(attempts, timeout=provider.hedge_after)
+                if not done:
+                    attempts.append(asyncio.create_task(provider.call(prompt)))
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return Result(provider.name, parse_score(task.result()), elapsed=time.perf_counter() - start, hedged=len(attempts) > 1)
+                    error = task.exception()
+    except TimeoutError:
+        error = f"timed out after {provider.timeout:.0f}s"
+    finally:
+        for task in attempts:
+            task.cancel()
+    return Result(provider.name, error=str(error), elapsed=time.perf_counter() - start, hedged=len(attempts) > 1)
+
+
+async def fan_out(providers, prompt):
+    """ Ask every provider at once and yield each Result as soon as it arrives """
+    for next_result in asyncio.as_completed([ask(provider, prompt) for provider in providers]):
+        yield await next_result
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """ One event loop on a daemon thread, shared by every fan_out_sync call so pooled clients are reused across runs """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="fanout-loop", daemon=True).start()
+            atexit.register(close_background_loop)
+        return _loop
+
+
+def close_background_loop():
+    """ Close the shared loop's pooled clients at interpreter exit """
+    asyncio.run_coroutine_threadsafe(clients.aclose(), _loop).result(timeout=5)
+
+
+def fan_out_sync(providers, prompt):
+    """ fan_out for synchronous callers such as Streamlit: runs on the shared background event loop """
+    results = queue.Queue()
+
+    async def produce():
+        try:
+            async for result in fan_out(providers, prompt):
+                results.put(result)
+        finally:
+            results.put(None)
+
+    future = asyncio.run_coroutine_threadsafe(produce(), background_loop())
+    try:
+        while (result := results.get()) is not None:
+            yield result
+    finally:
+        future.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fan a prompt out to mock providers and compare against asking them one by one")
+    parser.add_argument("--slow-rate", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--hedge-after", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    providers = mock_providers(slow_rate=args.slow_rate, fail_rate=args.fail_rate, seed=args.seed, timeout=args.timeout, hedge_after=args.hedge_after)
+    start = time.perf_counter()
+    for result in fan_out_sync(providers, "mock prompt"):
+        status = result.score if result.error is None else f"error: {result.error}"
+        print(f"{time.perf_counter() - start:6.2f}s  {result.name:<20} {status}{'  (hedged)' if result.hedged else ''}")
+    total = time.perf_counter() - start
+
+    async def sequential():
+        return [await ask(provider, "mock prompt") for provider in providers]
+    start = time.perf_counter()
+    asyncio.run_coroutine_threadsafe(sequential(), background_loop()).result()
+    print(f"concurrent: {total:.2f}s, one after another: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,86 @@
+"""
+Cheap local first-stage ranking of resumes against a job description, before any LLM call.
+
+    python prefilter.py labels.csv resumes/ jds/ --top-k 3 5 10
+
+labels.csv has columns resume, jd, relevant (1 or 0), naming files in the two directories.
+For each cutoff the report shows the share of LLM calls skipped and the share of relevant
+pairs that would have been filtered out.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from documents import load_documents
+
+
+def similarity(jd_texts, resume_texts):
+    """
+    TF-IDF cosine similarity of every resume to every JD, fitted on both sets together.
+
+    Returns:
+        np.ndarray: shape (len(jd_texts), len(resume_texts)), values in [0, 1].
+    """
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, ngram_range=(1, 2), min_df=1)
+    matrix = vectorizer.fit_transform(list(resume_texts) + list(jd_texts))
+    resumes, jds = matrix[:len(resume_texts)], matrix[len(resume_texts):]
+    # Rows are L2-normalised, so the sparse dot product is the cosine similarity
+    return (jds @ resumes.T).toarray()
+
+
+def shortlist(scores, top_k=None, min_similarity=0.0):
+    """
+    Boolean mask of the (JD, resume) pairs worth sending to the LLMs.
+
+    Args:
+        scores (np.ndarray): Output of similarity().
+        top_k (int): Keep at most this many resumes per JD; None keeps all.
+        min_similarity (float): Drop pairs scoring below this regardless of rank.
+    """
+    keep = scores >= min_similarity
+    if top_k is not None and top_k < scores.shape[1]:
+        # Indices of the top_k highest scores in each row, unordered
+        top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        ranked = np.zeros_like(keep)
+        np.put_along_axis(ranked, top, True, axis=1)
+        keep &= ranked
+    return keep
+
+
+def report(labels, resumes, jds, cutoffs, min_similarity=0.0):
+    """ Cost saved versus recall lost for each top-k cutoff, on a labeled sample """
+    resume_index = {doc["name"]: i for i, doc in enumerate(resumes)}
+    jd_index = {doc["name"]: i for i, doc in enumerate(jds)}
+    labels = labels[labels["resume"].isin(resume_index) & labels["jd"].isin(jd_index)]
+    rows, cols = labels["jd"].map(jd_index).to_numpy(), labels["resume"].map(resume_index).to_numpy()
+    relevant = labels["relevant"].astype(bool).to_numpy()
+
+    scores = similarity([doc["text"] for doc in jds], [doc["text"] for doc in resumes])
+    lines = []
+    for k in cutoffs:
+        kept = shortlist(scores, k, min_similarity)
+        lines.append({
+            "top_k": k if k is not None else "all",
+            "pairs_scored": int(kept.sum()),
+            "llm_calls_saved": round(1 - kept.sum() / kept.size, 3),
+            "recall": round(kept[rows, cols][relevant].mean(), 3) if relevant.any() else float("nan"),
+            "relevant_missed": int((~kept[rows, cols] & relevant).sum()),
+        })
+    return pd.DataFrame(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("labels", help="CSV with resume, jd, relevant columns")
+    parser.add_argument("resumes", help="directory of resumes")
+    parser.add_argument("jds", help="directory of job descriptions")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--min-similarity", type=float, default=0.0)
+    parser.add_argument("--cache-dir", default=".cache/text")
+    args = parser.parse_args()
+
+    resumes = load_documents(args.resumes, args.cache_dir)
+    jds = load_documents(args.jds, args.cache_dir)
+    table = report(pd.read_csv(args.labels), resumes, jds, [None] + args.top_k, args.min_similarity)
+    print(f"{len(resumes)} resumes x {len(jds)} JDs")
+    print(table.to_string(index=False))
@@ -1,12 +1,14 @@
 import streamlit as st
 import os
-from openai import OpenAI
-from anthropic import Anthropic
-import pdfplumber
-from io import StringIO
 from dotenv import load_dotenv
 import pandas as pd
 from multi_file_ingestion import load_and_split_resume
+from documents import extract_file_text
+from fanout import default_providers, mock_providers
+from llm_clients import clients
+from resume_prompt import build_prompt
+from score_cache import ScoreCache, cached_fan_out
+from candidate_name import guess_name
 
 # Load environment variables
 load_dotenv(override=True)
@@ -16,7 +18,28 @@ google_api_key = os.getenv("GOOGLE_API_KEY")
 groq_api_key = os.getenv("GROQ_API_KEY")
 deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
 
-openai = OpenAI()
+openai = clients.openai()
+
+# Streamlit re-runs this script on every interaction, so the providers and the cache are built once per process
+
+# MOCK_PROVIDERS=1 swaps the five APIs for local mocks with injected latency
+@st.cache_resource
+def load_providers():
+    provider_timeout = float(os.getenv("PROVIDER_TIMEOUT", "30"))
+    hedge_after = float(os.getenv("HEDGE_AFTER")) if os.getenv("HEDGE_AFTER") else None
+    if os.getenv("MOCK_PROVIDERS"):
+        return mock_providers(timeout=provider_timeout, hedge_after=hedge_after)
+    return default_providers(timeout=provider_timeout, hedge_after=hedge_after)
+
+
+# Scores and names for documents seen before, keyed by text hash; one SQLite connection shared by every session
+@st.cache_resource
+def load_score_cache():
+    return ScoreCache(os.getenv("SCORE_CACHE_PATH", ".cache/scores.db"), ttl=float(os.getenv("SCORE_CACHE_TTL_DAYS", "30")) * 86400)
+
+
+providers = load_providers()
+cache = load_score_cache()
 
 # Streamlit UI
 st.set_page_config(page_title="LLM Resume–JD Fit", layout="wide")
@@ -50,16 +73,28 @@ st.markdown("""
 resume_file = st.file_uploader("📄 Upload Resume (any file type)", type=None)
 jd_file = st.file_uploader("📝 Upload Job Description (any file type)", type=None)
 
-# Function to extract text from uploaded files
-def extract_text(file):
-    if file.name.endswith(".pdf"):
-        with pdfplumber.open(file) as pdf:
-            return "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-    else:
-        return StringIO(file.read().decode("utf-8")).read()
+# Function to extract text from a saved upload: PDFs page by page (parallel, cached), other formats via LangChain
+def extract_text(path):
+    if path.lower().endswith(".pdf"):
+        return extract_file_text(path)
+    docs = load_and_split_resume(path)
+    return "\n".join([doc.page_content for doc in docs])
 
 
+# Function to get the candidate name: cache, then a local heuristic, then the LLM
 def extract_candidate_name(resume_text):
+    name = cache.get_name(resume_text)
+    if name:
+        return name
+    name, confidence = guess_name(resume_text)
+    if confidence < 0.75:
+        name = extract_candidate_name_llm(resume_text)
+    if name and name != "Unknown":
+        cache.put_name(resume_text, name)
+    return name or "Unknown"
+
+
+def extract_candidate_name_llm(resume_text):
     prompt = f"""
 You are an AI assistant specialized in resume analysis.
 
@@ -86,175 +121,68 @@ Respond with only the candidate's full name.
         return "Unknown"
 
 
-# Function to build the prompt for LLMs
-def build_prompt(resume_text, jd_text):
-    prompt = f"""
-You are an AI assistant specialized in resume analysis and recruitment. Analyze the given resume and compare it with the job description. 
-
-Your task is to evaluate how well the resume aligns with the job description.
-
-
-Provide a match percentage between 0 and 100, where 100 indicates a perfect fit.
-
-Resume:
-{resume_text}
-
-Job Description:
-{jd_text}
-
-Respond with only the match percentage as an integer.
-"""
-    return prompt.strip()
-
-# Function to get match percentage from OpenAI GPT-4
-def get_openai_match(prompt):
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a professional resume evaluator."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        content = response.choices[0].message.content
-        digits = ''.join(filter(str.isdigit, content))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"OpenAI API Error: {e}")
-        return 0
-
-# Function to get match percentage from Anthropic Claude
-def get_anthropic_match(prompt):
-    try:
-        model_name = "claude-3-7-sonnet-latest"
-        claude = Anthropic()
-        
-        message = claude.messages.create(
-            model=model_name,
-            max_tokens=100,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        content = message.content[0].text
-        digits = ''.join(filter(str.isdigit, content))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"Anthropic API Error: {e}")
-        return 0
-
-# Function to get match percentage from Google Gemini
-def get_google_match(prompt):
-    try:
-        gemini = OpenAI(api_key=google_api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
-        model_name = "gemini-2.0-flash"
-        messages = [{"role": "user", "content": prompt}]
-        response = gemini.chat.completions.create(model=model_name, messages=messages)
-        content = response.choices[0].message.content
-        digits = ''.join(filter(str.isdigit, content))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"Google Gemini API Error: {e}")
-        return 0
-
-# Function to get match percentage from Groq
-def get_groq_match(prompt):
-    try:
-        groq = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-        model_name = "llama-3.3-70b-versatile"
-        messages = [{"role": "user", "content": prompt}]
-        response = groq.chat.completions.create(model=model_name, messages=messages)
-        answer = response.choices[0].message.content
-        digits = ''.join(filter(str.isdigit, answer))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"Groq API Error: {e}")
-        return 0
-
-# Function to get match percentage from DeepSeek
-def get_deepseek_match(prompt):
-    try:
-        deepseek = OpenAI(api_key=deepseek_api_key, base_url="https://api.deepseek.com/v1")
-        model_name = "deepseek-chat"
-        messages = [{"role": "user", "content": prompt}]
-        response = deepseek.chat.completions.create(model=model_name, messages=messages)
-        answer = response.choices[0].message.content
-        digits = ''.join(filter(str.isdigit, answer))
-        return min(int(digits), 100) if digits else 0
-    except Exception as e:
-        st.error(f"DeepSeek API Error: {e}")
-        return 0
+# Convert a results dataframe to an HTML table
+def render_custom_table(dataframe):
+    table_html = "<table style='border-collapse: collapse; width: auto;'>"
+    # Table header
+    table_html += "<thead><tr>"
+    for col in dataframe.columns:
+        table_html += f"<th style='text-align: center; padding: 8px; border-bottom: 1px solid #ddd;'>{col}</th>"
+    table_html += "</tr></thead>"
+
+    # Table rows
+    table_html += "<tbody>"
+    for _, row in dataframe.iterrows():
+        table_html += "<tr>"
+        for val in row:
+            table_html += f"<td style='text-align: left; padding: 8px; border-bottom: 1px solid #eee;'>{val}</td>"
+        table_html += "</tr>"
+    table_html += "</tbody></table>"
+    return table_html
 
 # Main action
 if st.button("🔍 Analyze Resume Fit"):
     if resume_file and jd_file:
         with st.spinner("Analyzing..."):
-            # resume_text = extract_text(resume_file)
-            # jd_text = extract_text(jd_file)
             os.makedirs("temp_files", exist_ok=True)
             resume_path = os.path.join("temp_files", resume_file.name)
     
             with open(resume_path, "wb") as f:
                 f.write(resume_file.getbuffer())
-            resume_docs = load_and_split_resume(resume_path)
-            resume_text = "\n".join([doc.page_content for doc in resume_docs])
+            resume_text = extract_text(resume_path)
 
             jd_path = os.path.join("temp_files", jd_file.name)  
             with open(jd_path, "wb") as f:
                 f.write(jd_file.getbuffer())
-            jd_docs = load_and_split_resume(jd_path)
-            jd_text = "\n".join([doc.page_content for doc in jd_docs])
+            jd_text = extract_text(jd_path)
 
             candidate_name = extract_candidate_name(resume_text)
             prompt = build_prompt(resume_text, jd_text)
 
-            # Get match percentages from all models
-            scores = {
-                "OpenAI GPT-4o Mini": get_openai_match(prompt),
-                "Anthropic Claude": get_anthropic_match(prompt),
-                "Google Gemini": get_google_match(prompt),
-                "Groq": get_groq_match(prompt),
-                "DeepSeek": get_deepseek_match(prompt),
-            }
-
-            # Calculate average score
-            average_score = round(sum(scores.values()) / len(scores), 2)
-
-            # Sort scores in descending order
-            sorted_scores = sorted(scores.items(), reverse=False)
-
-            # Display results
-            st.success("✅ Analysis Complete")
-            st.subheader("📊 Match Results (Ranked by Model)")
-
             # Show candidate name
             st.markdown(f"**👤 Candidate:** {candidate_name}")
-
-            # Create and sort dataframe
-            df = pd.DataFrame(sorted_scores, columns=["Model", "% Match"])
-            df = df.sort_values("% Match", ascending=False).reset_index(drop=True)
-
-            # Convert to HTML table
-            def render_custom_table(dataframe):
-                table_html = "<table style='border-collapse: collapse; width: auto;'>"
-                # Table header
-                table_html += "<thead><tr>"
-                for col in dataframe.columns:
-                    table_html += f"<th style='text-align: center; padding: 8px; border-bottom: 1px solid #ddd;'>{col}</th>"
-                table_html += "</tr></thead>"
-
-                # Table rows
-                table_html += "<tbody>"
-                for _, row in dataframe.iterrows():
-                    table_html += "<tr>"
-                    for val in row:
-                        table_html += f"<td style='text-align: left; padding: 8px; border-bottom: 1px solid #eee;'>{val}</td>"
-                    table_html += "</tr>"
-                table_html += "</tbody></table>"
-                return table_html
-
-            # Display table
-            st.markdown(render_custom_table(df), unsafe_allow_html=True)
+            st.subheader("📊 Match Results (Ranked by Model)")
+            table = st.empty()
+
+            # Ask all models at once and redraw the table as each score arrives
+            scores, from_cache = {}, 0
+            for result in cached_fan_out(cache, providers, resume_text, jd_text, prompt):
+                if result.error is not None:
+                    st.error(f"{result.name} API Error: {result.error}")
+                    continue
+                scores[result.name] = result.score
+                from_cache += result.cached
+                df = pd.DataFrame(scores.items(), columns=["Model", "% Match"])
+                df = df.sort_values("% Match", ascending=False).reset_index(drop=True)
+                table.markdown(render_custom_table(df), unsafe_allow_html=True)
+
+            if not scores:
+                st.error("No model returned a score.")
+                st.stop()
+
+            # Calculate average score over the models that answered
+            average_score = round(sum(scores.values()) / len(scores), 2)
+            st.success(f"✅ Analysis Complete ({len(scores)} of {len(providers)} models, {from_cache} from cache)")
 
             # Show average match
             st.metric(label="📈 Average Match %", value=f"{average_score:.2f}%")
@@ -0,0 +1,21 @@
+# Prompts shared by the Streamlit app and the batch scorer
+
+# Function to build the prompt for LLMs
+def build_prompt(resume_text, jd_text):
+    prompt = f"""
+You are an AI assistant specialized in resume analysis and recruitment. Analyze the given resume and compare it with the job description. 
+
+Your task is to evaluate how well the resume aligns with the job description.
+
+
+Provide a match percentage between 0 and 100, where 100 indicates a perfect fit.
+
+Resume:
+{resume_text}
+
+Job Description:
+{jd_text}
+
+Respond with only the match percentage as an integer.
+"""
+    return prompt.strip()
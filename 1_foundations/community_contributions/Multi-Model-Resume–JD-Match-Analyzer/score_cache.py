@@ -0,0 +1,72 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from fanout import Result, fan_out_sync
+
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Persistent match scores and candidate names, keyed by the SHA-256 of the extracted text.
+
+    A score is stored per (resume, JD, provider, model), so changing a provider's model
+    never returns the old model's score. Entries older than `ttl` seconds are ignored
+    and deleted on the next write.
+    """
+
+    def __init__(self, path=".cache/scores.db", ttl=30 * 86400):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS scores (resume_sha256 TEXT, jd_sha256 TEXT, provider TEXT, model TEXT,
+            score INTEGER, created REAL, PRIMARY KEY (resume_sha256, jd_sha256, provider, model))""")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS names (resume_sha256 TEXT PRIMARY KEY, name TEXT, created REAL)")
+        self.conn.commit()
+
+    def get_score(self, resume_text, jd_text, provider, model):
+        with self.lock:
+            row = self.conn.execute("""SELECT score FROM scores WHERE resume_sha256 = ? AND jd_sha256 = ? AND provider = ?
+                AND model = ? AND created >= ?""", (text_sha256(resume_text), text_sha256(jd_text), provider, model, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def put_score(self, resume_text, jd_text, provider, model, score):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)",
+                              (text_sha256(resume_text), text_sha256(jd_text), provider, model, score, time.time()))
+            self.conn.execute("DELETE FROM scores WHERE created < ?", (time.time() - self.ttl,))
+
+    def get_name(self, resume_text):
+        with self.lock:
+            row = self.conn.execute("SELECT name FROM names WHERE resume_sha256 = ? AND created >= ?",
+                                    (text_sha256(resume_text), time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def put_name(self, resume_text, name):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO names VALUES (?, ?, ?)", (text_sha256(resume_text), name, time.time()))
+
+
+def cached_fan_out(cache, providers, resume_text, jd_text, prompt):
+    """ Yield cached scores straight away, then fan out to the providers that had none and cache what they return """
+    missing = []
+    for provider in providers:
+        score = cache.get_score(resume_text, jd_text, provider.name, provider.model)
+        if score is None:
+            missing.append(provider)
+        else:
+            yield Result(provider.name, score, cached=True)
+    if not missing:
+        return
+    models = {provider.name: provider.model for provider in missing}
+    for result in fan_out_sync(missing, prompt):
+        if result.error is None:
+            cache.put_score(resume_text, jd_text, result.name, models[result.name], result.score)
+        yield result
@@ -6,11 +6,15 @@ import requests
 from pypdf import PdfReader
 import gradio as gr
 import base64
-import time
-from collections import defaultdict
 import fastapi
 from gradio.context import Context
 import logging
+import sys
+from pathlib import Path
+
+# rate_limiting is shared with the 1_foundations apps
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from rate_limiting import SlidingWindowCounter, SQLiteBackend
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -18,29 +22,6 @@ logger.setLevel(logging.DEBUG)
 
 load_dotenv(override=True)
 
-class RateLimiter:
-    def __init__(self, max_requests=5, time_window=5):
-        # max_requests per time_window seconds
-        self.max_requests = max_requests
-        self.time_window = time_window  # in seconds
-        self.request_history = defaultdict(list)
-        
-    def is_rate_limited(self, user_id):
-        current_time = time.time()
-        # Remove old requests
-        self.request_history[user_id] = [
-            timestamp for timestamp in self.request_history[user_id]
-            if current_time - timestamp < self.time_window
-        ]
-        
-        # Check if user has exceeded the limit
-        if len(self.request_history[user_id]) >= self.max_requests:
-            return True
-        
-        # Add current request
-        self.request_history[user_id].append(current_time)
-        return False
-
 def push(text):
     requests.post(
         "https://api.pushover.net/1/messages.json",
@@ -131,7 +112,9 @@ class Me:
     def __init__(self):
         self.openai = OpenAI(api_key=os.getenv("GOOGLE_API_KEY"), base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
         self.name = "Sagarnil Das"
-        self.rate_limiter = RateLimiter(max_requests=5, time_window=60)  # 5 messages per minute
+        # 5 messages per minute; set RATE_LIMIT_DB to share the counters between worker processes
+        backend = SQLiteBackend(os.getenv("RATE_LIMIT_DB")) if os.getenv("RATE_LIMIT_DB") else None
+        self.rate_limiter = SlidingWindowCounter(max_requests=5, window=60, backend=backend)
         reader = PdfReader("me/linkedin.pdf")
         self.linkedin = ""
         for page in reader.pages:
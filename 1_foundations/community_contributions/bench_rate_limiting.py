@@ -0,0 +1,84 @@
+""" Microbenchmark: rate limiting a million distinct users
+
+    python bench_rate_limiting.py                 # 1M users, memory backend vs the old list-of-timestamps limiter
+    python bench_rate_limiting.py --sqlite 50000  # also time the SQLite backend with 50k users
+    python bench_rate_limiting.py --users 10000 --requests 300 --limit 100   # few busy users
+
+Each user sends `--requests` messages spread over simulated time (no sleeping), so idle users
+age out of the new limiters while the old one keeps every key it has ever seen. The old limiter's
+per-request cost grows with --limit (the list it filters), the new ones' does not.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from rate_limiting import SQLiteBackend, SlidingWindowCounter, TokenBucket
+
+
+class ListRateLimiter:
+    """ The previous limiter: a list of timestamps per user, filtered on every request """
+
+    def __init__(self, max_requests=5, time_window=60):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.request_history = defaultdict(list)
+
+    def allow(self, user_id, now):
+        self.request_history[user_id] = [t for t in self.request_history[user_id] if now - t < self.time_window]
+        if len(self.request_history[user_id]) >= self.max_requests:
+            return False
+        self.request_history[user_id].append(now)
+        return True
+
+    def __len__(self):
+        return len(self.request_history)
+
+
+def run(name, limiter, keys, users, requests, duration):
+    """ Send `requests` rounds over all users, spread evenly over `duration` simulated seconds """
+    total = users * requests
+    start = time.perf_counter()
+    for i in range(total):
+        limiter.allow(keys[i % users], i * duration / total)
+    elapsed = time.perf_counter() - start
+    if isinstance(limiter, ListRateLimiter):
+        size = len(limiter)
+    else:
+        # Count what survives a sweep at the end of the run, not whatever the last periodic sweep left
+        limiter.backend.evict(duration - limiter.idle_after)
+        size = len(limiter.backend)
+    print(f"{name:<32} {elapsed * 1e9 / total:8.0f} ns/op  {total / elapsed:10.0f} ops/s  {size:>9} keys held", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=3, help="requests per user")
+    parser.add_argument("--limit", type=int, default=5, help="allowed requests per minute")
+    parser.add_argument("--duration", type=float, default=600.0, help="simulated seconds the traffic is spread over")
+    parser.add_argument("--sqlite", type=int, default=0, metavar="USERS", help="also benchmark the SQLite backend with this many users")
+    args = parser.parse_args()
+
+    keys = [f"user-{i}" for i in range(args.users)]
+    print(f"{args.users} users x {args.requests} requests over {args.duration:.0f}s, limit {args.limit}/min", flush=True)
+    run("list of timestamps (old)", ListRateLimiter(args.limit, 60), keys, args.users, args.requests, args.duration)
+    run("sliding window counter", SlidingWindowCounter(args.limit, 60), keys, args.users, args.requests, args.duration)
+    run("token bucket", TokenBucket(args.limit / 60, args.limit), keys, args.users, args.requests, args.duration)
+
+    if args.sqlite:
+        keys = keys[:args.sqlite]
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"\nSQLite backend, {args.sqlite} users", flush=True)
+            run("sliding window counter (sqlite)", SlidingWindowCounter(args.limit, 60, SQLiteBackend(os.path.join(tmp, "sw.db"))),
+                keys, args.sqlite, args.requests, args.duration)
+            run("token bucket (sqlite)", TokenBucket(args.limit / 60, args.limit, SQLiteBackend(os.path.join(tmp, "tb.db"))),
+                keys, args.sqlite, args.requests, args.duration)
+
+
+if __name__ == "__main__":
+    main()
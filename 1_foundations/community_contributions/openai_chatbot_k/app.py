@@ -3,5 +3,6 @@ import requests
 from chatbot import Chatbot
 
 chatbot = Chatbot()
+chatbot.warm_up()
 
 gr.ChatInterface(chatbot.chat, type="messages").launch()
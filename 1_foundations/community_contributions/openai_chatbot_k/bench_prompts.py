@@ -0,0 +1,45 @@
+""" Per-message cost of building the system prompt, before and after the prompt cache
+
+    python bench_prompts.py --messages 50
+
+No API calls are made: this times only the work chat() does before it calls OpenAI.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+from chatbot import Chatbot
+from ratelimiter import RateLimiter
+
+
+class NoLimit(RateLimiter):
+    def allow(self, key) -> bool:
+        return True
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    chatbot = Chatbot(ratelimiter=NoLimit())
+    start = time.perf_counter()
+    chatbot.warm_up()
+    print(f"warm-up: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    uncached = timed(chatbot._Chatbot__get_prompts, args.messages)
+    cached = timed(chatbot.prompts.get, args.messages)
+    print(f"re-parse every message: median {uncached[0]:.2f} ms, max {uncached[1]:.2f} ms")
+    print(f"prompt cache:           median {cached[0]:.4f} ms, max {cached[1]:.4f} ms")
+    print(f"saved per message:      {uncached[0] - cached[0]:.2f} ms")
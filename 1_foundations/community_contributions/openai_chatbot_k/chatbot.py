@@ -1,15 +1,56 @@
 # import all related modules
-from openai import OpenAI
 import json
+import sys
+from pathlib import Path
 from pypdf import PdfReader
-from environment import api_key, ai_model, resume_file, summary_file, name, ratelimit_api, request_token
+import gradio as gr
+from environment import api_key, ai_model, resume_file, summary_file, name, ratelimit_api, request_token, \
+    ratelimit_per_minute, ratelimit_burst, ratelimit_window, ratelimit_db, proxy_hops
 from pushover import Pushover
-import requests
 from exception import RateLimitError
+from ratelimiter import LocalRateLimiter, RemoteRateLimiter, CombinedRateLimiter
+from promptcache import PromptCache
+from openai import OpenAI
+
+# shared long-lived clients from 1_foundations/llm_clients.py when run inside the course repo,
+# otherwise a single OpenAI client of our own
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+try:
+    from llm_clients import clients
+except ImportError:
+    clients = None
 
 
 class Chatbot:
-    __openai = OpenAI(api_key=api_key)
+    __openai = clients.openai(api_key=api_key) if clients else OpenAI(api_key=api_key)
+
+    def __init__(self, ratelimiter=None):
+        self.ratelimiter = ratelimiter or self.__default_ratelimiter()
+        # one system prompt per resume version, shared by every session
+        self.prompts = PromptCache(self.__get_prompts, resume_file, summary_file)
+
+    # build the prompt before the first visitor arrives
+    def warm_up(self):
+        self.prompts.get()
+
+    # local token bucket per user, plus the remote service when RATELIMIT_API is set
+    def __default_ratelimiter(self):
+        local = LocalRateLimiter(ratelimit_per_minute / 60, ratelimit_burst, ratelimit_db)
+        if not ratelimit_api:
+            return local
+        # remote first: it only reads a cached verdict, so a blocked message doesn't spend a local token
+        return CombinedRateLimiter(RemoteRateLimiter(ratelimit_api, request_token, window=ratelimit_window), local)
+
+    # identify the user by ip, falling back to the gradio session
+    def __user_key(self, request):
+        if request is None:
+            return "anonymous"
+        # same rule as 1_foundations/serve.py: only the hops our own proxies appended are trusted,
+        # anything before them is written by the client and would give it a fresh bucket per message
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if proxy_hops > 0 and forwarded:
+            return forwarded[-min(proxy_hops, len(forwarded))]
+        return request.client.host if request.client else request.session_hash
 
     # define tools setup for OpenAI
     def __tools(self):
@@ -108,22 +149,12 @@ class Chatbot:
         return system_prompt
 
     # chatbot function
-    def chat(self, message, history):
+    def chat(self, message, history, request: gr.Request = None):
         try:
-            # implementation of ratelimiter here
-            response = requests.post(
-                ratelimit_api,
-                json={"token": request_token}
-            )
-            status_code = response.status_code
-
-            if (status_code == 429):
-                raise RateLimitError()
-
-            elif (status_code != 201):
-                raise Exception(f"Unexpected status code from rate limiter: {status_code}")
+            if not self.ratelimiter.allow(self.__user_key(request)):
+                raise RateLimitError("Too many requests! Please wait a moment and try again.")
 
-            system_prompt = self.__get_prompts()
+            system_prompt = self.prompts.get()
             tools = self.__tools();
 
             messages = []
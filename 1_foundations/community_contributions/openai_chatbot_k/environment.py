@@ -9,6 +9,11 @@ pushover_token = os.getenv('PUSHOVER_TOKEN')
 api_key = os.getenv("OPENAI_API_KEY")
 ratelimit_api = os.getenv("RATELIMIT_API")
 request_token = os.getenv("REQUEST_TOKEN")
+ratelimit_per_minute = float(os.getenv("RATELIMIT_PER_MINUTE", "10"))
+ratelimit_burst = int(os.getenv("RATELIMIT_BURST", "10"))
+ratelimit_window = float(os.getenv("RATELIMIT_WINDOW", "60"))
+ratelimit_db = os.getenv("RATELIMIT_DB", "./ratelimit.db")
+proxy_hops = int(os.getenv("PROXY_HOPS", "0"))
 
 ai_model = "gpt-4o-mini"
 resume_file = "./me/software-developer.pdf"
@@ -0,0 +1,40 @@
+import hashlib
+import os
+import threading
+
+
+# caches a value built from some files, rebuilding only when one of the files really changes
+class PromptCache:
+    def __init__(self, build, *paths):
+        self.build = build
+        self.paths = paths
+        self.__lock = threading.Lock()
+        self.__stats = None
+        self.__digest = None
+        self.__value = None
+
+    # cheap check on every call: mtime and size of each file
+    def __stat(self):
+        return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, self.paths))
+
+    # only hashed when a stat changed, so touching a file without editing it doesn't rebuild
+    def __hash(self):
+        digest = hashlib.sha256()
+        for path in self.paths:
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def get(self):
+        stats = self.__stat()
+        if stats == self.__stats:
+            return self.__value
+        with self.__lock:
+            if stats != self.__stats:
+                digest = self.__hash()
+                if digest != self.__digest:
+                    print(f"Building prompt for {', '.join(self.paths)}", flush=True)
+                    self.__value = self.build()
+                    self.__digest = digest
+                self.__stats = stats
+            return self.__value
@@ -0,0 +1,175 @@
+""" A local stand-in for the OpenAI / Gemini chat completions API, for load tests that cost nothing
+
+    python fake_llm_server.py --port 8900 --latency 0.4 --tool-call-rate 0.1 --eval-fail-rate 0.2
+
+Point an OpenAI client at http://127.0.0.1:8900/v1 with any api_key. Besides chat completions
+(streamed or not, with tool calls and structured evaluator output) it serves /v1/embeddings,
+a Pushover-style /push endpoint and GET /stats with the call and token counters.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("I led the product team through a platform migration that cut onboarding time and grew "
+         "revenue while mentoring engineers and shipping AI features our customers relied on").split()
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class FakeLLM:
+    def __init__(self, latency=0.3, jitter=0.1, token_delay=0.005, reply_tokens=60, tool_call_rate=0.1, eval_fail_rate=0.1, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.reply_tokens = reply_tokens
+        self.tool_call_rate = tool_call_rate
+        self.eval_fail_rate = eval_fail_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {"chat": 0, "evaluations": 0, "rejections": 0, "reruns": 0, "tool_calls": 0,
+                          "embeddings": 0, "pushes": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def count(self, **increments):
+        with self.lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def chance(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def wait(self):
+        with self.lock:
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter))
+        time.sleep(delay)
+
+    def complete(self, body):
+        """ Return (content, tool_calls) for a chat completion request """
+        messages = body.get("messages", [])
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        if body.get("response_format"):
+            acceptable = not self.chance(self.eval_fail_rate)
+            self.count(evaluations=1, rejections=int(not acceptable), prompt_tokens=prompt_tokens, completion_tokens=20)
+            return json.dumps({"is_acceptable": acceptable, "feedback": "Looks good" if acceptable else "Too generic, add specifics"}), None
+        if any("Previous answer rejected" in str(m.get("content") or "") for m in messages):
+            self.count(reruns=1)
+        last_role = messages[-1].get("role") if messages else None
+        if body.get("tools") and last_role != "tool" and self.chance(self.tool_call_rate):
+            self.count(chat=1, tool_calls=1, prompt_tokens=prompt_tokens, completion_tokens=20)
+            arguments = json.dumps({"question": str(messages[-1].get("content"))[:80]})
+            return None, [{"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                           "function": {"name": "record_unknown_question", "arguments": arguments}}]
+        self.count(chat=1, prompt_tokens=prompt_tokens, completion_tokens=self.reply_tokens)
+        return " ".join(self.random.choice(WORDS) for _ in range(self.reply_tokens)), None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    llm: FakeLLM = None
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.llm.lock:
+                self._json(dict(self.llm.stats))
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.rstrip("/").endswith("/push"):
+            self.llm.count(pushes=1)
+            return self._json({"status": 1})
+        body = json.loads(raw or b"{}")
+        if self.path.endswith("/embeddings"):
+            self.llm.count(embeddings=1)
+            seed = hashlib.sha256(str(body.get("input")).encode("utf-8")).digest()
+            return self._json({"object": "list", "model": body.get("model"), "data": [
+                {"object": "embedding", "index": 0, "embedding": [b / 255 for b in seed] * 8}]})
+        if not self.path.endswith("/chat/completions"):
+            return self._json({"error": "not found"}, 404)
+
+        self.llm.wait()
+        content, tool_calls = self.llm.complete(body)
+        if body.get("stream"):
+            return self._stream(body, content, tool_calls)
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self._json({
+            "id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion", "created": int(time.time()), "model": body.get("model"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def _stream(self, body, content, tool_calls):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model")}
+
+        def send(delta, finish_reason=None):
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if tool_calls:
+            send({"role": "assistant", "tool_calls": [dict(call, index=i) for i, call in enumerate(tool_calls)]})
+            send({}, "tool_calls")
+        else:
+            for word in content.split(" "):
+                send({"content": word + " "})
+                time.sleep(self.llm.token_delay)
+            send({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(llm, host="127.0.0.1", port=0):
+    """ Start the server on a background thread; returns (server, base_url) """
+    handler = type("FakeLLMHandler", (Handler,), {"llm": llm})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.3, help="mean seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between streamed tokens")
+    parser.add_argument("--tool-call-rate", type=float, default=0.1)
+    parser.add_argument("--eval-fail-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    llm = FakeLLM(args.latency, args.jitter, args.token_delay, tool_call_rate=args.tool_call_rate, eval_fail_rate=args.eval_fail_rate)
+    server, base_url = serve(llm, port=args.port)
+    print(f"Fake LLM server on {base_url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+except Exception:
+    def count_tokens(text):
+        # Rough fallback when tiktoken (or its encoding download) is unavailable
+        return len(text) // 4
+
+
+def message_tokens(message):
+    # ~4 tokens of per-message overhead in the chat format
+    return count_tokens(message.get("content") or "") + 4
+
+
+def transcript(messages):
+    """ Plain "User: ... / Agent: ..." text, instead of the repr of a list of dicts """
+    speakers = {"user": "User", "assistant": "Agent", "system": "Context"}
+    return "\n\n".join(f"{speakers.get(m['role'], m['role'])}: {m.get('content') or ''}" for m in messages)
+
+
+class HistoryWindow:
+    """ Keep the most recent turns within a token budget and fold older turns into a running summary
+
+    Summaries are cached by a rolling hash of the conversation prefix they cover, so each session's
+    summary is only extended with the newly dropped turns instead of being recomputed every turn.
+    """
+
+    def __init__(self, summarize, budget=4000, cache_size=512):
+        self.summarize = summarize
+        self.budget = budget
+        self.cache_size = cache_size
+        self.summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clean(history):
+        # Gradio adds metadata/options keys the APIs do not accept
+        return [{"role": m["role"], "content": m.get("content")} for m in history if m.get("role") in ("user", "assistant")]
+
+    @staticmethod
+    def _prefix_hashes(history):
+        hashes, digest = [], hashlib.sha256()
+        for message in history:
+            digest.update(json.dumps([message["role"], message["content"]]).encode("utf-8"))
+            hashes.append(digest.copy().hexdigest())
+        return hashes
+
+    def _cut(self, history):
+        """ Index of the first message kept verbatim; the window always starts on a user turn """
+        used, cut = 0, len(history)
+        for i in range(len(history) - 1, -1, -1):
+            used += message_tokens(history[i])
+            if used > self.budget:
+                break
+            if history[i]["role"] == "user":
+                cut = i
+        return cut
+
+    def _summary(self, history, cut):
+        hashes = self._prefix_hashes(history[:cut])
+        with self._lock:
+            start, summary = 0, None
+            for j in range(cut, 0, -1):
+                if hashes[j - 1] in self.summaries:
+                    start, summary = j, self.summaries[hashes[j - 1]]
+                    self.summaries.move_to_end(hashes[j - 1])
+                    break
+        if start == cut:
+            return summary
+        summary = self.summarize(summary, history[start:cut])
+        with self._lock:
+            self.summaries[hashes[cut - 1]] = summary
+            while len(self.summaries) > self.cache_size:
+                self.summaries.popitem(last=False)
+        return summary
+
+    def apply(self, history):
+        """ The history to send: a summary of older turns (if any) followed by the recent turns """
+        history = self._clean(history)
+        cut = self._cut(history)
+        if cut == 0:
+            return history
+        try:
+            summary = self._summary(history, cut)
+        except Exception as e:
+            print(f"Could not summarize earlier turns: {e}", flush=True)
+            return history[cut:]
+        return [{"role": "system", "content": f"## Summary of the earlier conversation:\n{summary}"}] + history[cut:]
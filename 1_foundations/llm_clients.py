@@ -0,0 +1,213 @@
+""" Long-lived LLM clients shared by the foundations apps, with connection reuse and per-provider metrics
+
+    from llm_clients import clients
+    openai = clients.openai()
+    gemini = clients.openai(base_url=GEMINI_BASE_URL, api_key=os.getenv("GOOGLE_API_KEY"), provider="gemini")
+
+One client (and one HTTP connection pool) per provider, base_url and key, instead of a client per
+app or per call, so TLS handshakes happen once per connection rather than once per request. HTTP/2
+is used when the `h2` package is installed. Pool sizes and timeouts come from the environment:
+
+    LLM_MAX_CONNECTIONS   connections per client (default 20)
+    LLM_MAX_KEEPALIVE     idle connections kept open per client (default 10)
+    LLM_KEEPALIVE_EXPIRY  seconds an idle connection is kept (default 120)
+    LLM_TIMEOUT           read timeout in seconds (default 60)
+    LLM_CONNECT_TIMEOUT   connect timeout in seconds (default 5)
+    LLM_HTTP2             "0" to force HTTP/1.1
+
+Async clients are pooled per event loop. A short-lived loop should end with `await clients.aclose()`,
+or be started with clients.run(main) instead of asyncio.run(main), so its connections are closed.
+
+clients.stats() returns request counts, errors and latency percentiles per provider. Latency is
+measured to the response headers, so for streamed completions it is the time to the first byte.
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+import httpx
+
+
+class ProviderStats:
+    def __init__(self, window=1000):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 1) if ordered else None
+        return {"requests": self.requests, "errors": self.errors, "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+                "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99)}
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.providers = defaultdict(ProviderStats)
+
+    def record(self, provider, seconds, error):
+        with self.lock:
+            stats = self.providers[provider]
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.latencies.append(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {provider: stats.snapshot() for provider, stats in self.providers.items()}
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    def __init__(self, provider, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.metrics = metrics
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.metrics.record(self.provider, time.perf_counter() - start, True)
+            raise
+        self.metrics.record(self.provider, time.perf_counter() - start, response.status_code >= 400)
+        return response
+
+
+class AsyncMeteredTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, provider, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.metrics = metrics
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.metrics.record(self.provider, time.perf_counter() - start, True)
+            raise
+        self.metrics.record(self.provider, time.perf_counter() - start, response.status_code >= 400)
+        return response
+
+
+def provider_name(base_url, default):
+    """ A metrics label from the base_url host: api.groq.com -> groq """
+    if not base_url:
+        return default
+    host = urlparse(str(base_url)).hostname or default
+    parts = [p for p in host.split(".") if p not in ("api", "www", "com", "ai", "net", "io")]
+    if host in ("localhost", "127.0.0.1") or not parts:
+        return host
+    return parts[0] if parts[0] != "generativelanguage" else "gemini"
+
+
+class ClientPool:
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_expiry=120.0, timeout=60.0, connect_timeout=5.0, http2=None):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=keepalive_expiry)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        # HTTP/2 needs the optional h2 package; without it httpx stays on HTTP/1.1 keep-alive
+        available = importlib.util.find_spec("h2") is not None
+        self.http2 = available if http2 is None else (http2 and available)
+        self.metrics = Metrics()
+        self.lock = threading.Lock()
+        self.sync_clients = {}
+        # Async clients belong to the event loop they were first used on; entries for loops that
+        # have since closed are dropped on the next lookup
+        self.async_clients = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(os.getenv("LLM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120")),
+            timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            http2=None if os.getenv("LLM_HTTP2", "1") != "0" else False,
+        )
+
+    def http_client(self, provider):
+        transport = MeteredTransport(provider, self.metrics, http2=self.http2, limits=self.limits)
+        return httpx.Client(transport=transport, timeout=self.timeout)
+
+    def async_http_client(self, provider):
+        transport = AsyncMeteredTransport(provider, self.metrics, http2=self.http2, limits=self.limits)
+        return httpx.AsyncClient(transport=transport, timeout=self.timeout)
+
+    def _sync(self, kind, factory, base_url, api_key, provider, **kwargs):
+        key = (kind, provider, base_url, api_key, tuple(sorted(kwargs.items())))
+        with self.lock:
+            if key not in self.sync_clients:
+                self.sync_clients[key] = factory(self.http_client(provider))
+            return self.sync_clients[key]
+
+    def _async(self, kind, factory, base_url, api_key, provider, **kwargs):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not in a loop yet: the caller keeps this client and it binds to the first loop that uses it
+            return factory(self.async_http_client(provider))
+        key = (kind, provider, base_url, api_key, tuple(sorted(kwargs.items())))
+        with self.lock:
+            for closed in [other for other in self.async_clients if other.is_closed()]:
+                del self.async_clients[closed]
+            clients = self.async_clients.setdefault(loop, {})
+            if key not in clients:
+                clients[key] = factory(self.async_http_client(provider))
+            return clients[key]
+
+    def openai(self, base_url=None, api_key=None, provider=None, **kwargs):
+        from openai import OpenAI
+        provider = provider or provider_name(base_url, "openai")
+        return self._sync("openai", lambda http: OpenAI(base_url=base_url, api_key=api_key, http_client=http, **kwargs),
+                          base_url, api_key, provider, **kwargs)
+
+    def async_openai(self, base_url=None, api_key=None, provider=None, **kwargs):
+        """ Call from inside the event loop that will use the client, or once before any loop starts (e.g. at Gradio app setup) """
+        from openai import AsyncOpenAI
+        provider = provider or provider_name(base_url, "openai")
+        return self._async("openai", lambda http: AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http, **kwargs),
+                           base_url, api_key, provider, **kwargs)
+
+    def anthropic(self, api_key=None, **kwargs):
+        from anthropic import Anthropic
+        return self._sync("anthropic", lambda http: Anthropic(api_key=api_key, http_client=http, **kwargs), None, api_key, "anthropic", **kwargs)
+
+    def async_anthropic(self, api_key=None, **kwargs):
+        from anthropic import AsyncAnthropic
+        return self._async("anthropic", lambda http: AsyncAnthropic(api_key=api_key, http_client=http, **kwargs), None, api_key, "anthropic", **kwargs)
+
+    async def aclose(self):
+        """ Close the async clients of the running event loop """
+        with self.lock:
+            clients = self.async_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.close()
+
+    def run(self, main):
+        """ asyncio.run(main), closing the async clients it opened before its event loop goes away """
+        async def run_and_close():
+            try:
+                return await main
+            finally:
+                await self.aclose()
+        return asyncio.run(run_and_close())
+
+    def stats(self):
+        return self.metrics.snapshot()
+
+    def report(self):
+        lines = []
+        for provider, s in sorted(self.stats().items()):
+            lines.append(f"{provider}: {s['requests']} requests, {s['errors']} errors, p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms")
+        return "\n".join(lines)
+
+
+clients = ClientPool.from_env()
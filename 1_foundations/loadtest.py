@@ -0,0 +1,128 @@
+""" Drive concurrent simulated visitors through the resume avatar against a fake LLM backend
+
+    python loadtest.py --sessions 20 --turns 4 --latency 0.3 --eval-fail-rate 0.2
+    python loadtest.py --max-p95 3.0 --min-throughput 5    # exits 1 when a threshold is missed
+
+Each session calls me.chat_stream (the ChatInterface handler) turn by turn, carrying the history
+forward like the Gradio UI does. Nothing leaves the machine: both OpenAI clients and Pushover
+point at fake_llm_server.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fake_llm_server import FakeLLM, serve
+
+QUESTIONS = [
+    "Top career achievements", "AI projects & tech stack", "Leadership style", "Impact metrics",
+    "What are you working on now?", "How do you prioritise a roadmap?", "What is your favourite book?",
+    "Can we talk about a role? My email is visitor@example.com",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_session(handler, turns, rng):
+    """ One visitor: returns a list of (time to first token, total latency) per turn """
+    history, timings = [], []
+    for _ in range(turns):
+        message = rng.choice(QUESTIONS)
+        start = time.perf_counter()
+        first, reply = None, ""
+        for reply in handler(message, history):
+            if first is None:
+                first = time.perf_counter() - start
+        total = time.perf_counter() - start
+        timings.append((first if first is not None else total, total))
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+    return timings
+
+
+def run(args):
+    llm = FakeLLM(args.latency, args.jitter, args.token_delay, tool_call_rate=args.tool_call_rate, eval_fail_rate=args.eval_fail_rate, seed=args.seed)
+    server, base_url = serve(llm)
+    # Must be set before ai_resume_app is imported: the notifier and caches read them at import/init
+    os.environ["PUSHOVER_URL"] = base_url + "/push"
+    os.environ.setdefault("ANSWER_CACHE", "on" if args.cache else "off")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    from ai_resume_app import Me
+    from llm_clients import clients
+
+    me = Me(openai=clients.openai(base_url=base_url, api_key="fake", provider="openai", max_retries=0),
+            gemini=clients.openai(base_url=base_url, api_key="fake", provider="gemini", max_retries=0))
+    llm.reset()
+    rng = random.Random(args.seed)
+    seeds = [rng.random() for _ in range(args.sessions)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        sessions = list(pool.map(lambda seed: run_session(me.chat_stream, args.turns, random.Random(seed)), seeds))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    print(clients.report(), flush=True)
+
+    first = [t for session in sessions for t, _ in session]
+    total = [t for session in sessions for _, t in session]
+    stats = dict(llm.stats)
+    turns = len(total)
+    return {
+        "sessions": args.sessions, "turns": turns, "elapsed_s": round(elapsed, 3),
+        "throughput_turns_per_s": round(turns / elapsed, 2),
+        "ttft_p50_s": round(percentile(first, 50), 3), "ttft_p95_s": round(percentile(first, 95), 3),
+        "latency_p50_s": round(percentile(total, 50), 3), "latency_p95_s": round(percentile(total, 95), 3),
+        "latency_p99_s": round(percentile(total, 99), 3), "latency_mean_s": round(statistics.mean(total), 3),
+        "prompt_tokens_per_turn": round(stats["prompt_tokens"] / turns), "completion_tokens_per_turn": round(stats["completion_tokens"] / turns),
+        "llm_calls_per_turn": round((stats["chat"] + stats["evaluations"]) / turns, 2),
+        "rerun_rate": round(stats["reruns"] / turns, 3), "tool_calls": stats["tool_calls"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated visitors")
+    parser.add_argument("--turns", type=int, default=3, help="messages per visitor")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM mean seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--tool-call-rate", type=float, default=0.1)
+    parser.add_argument("--eval-fail-rate", type=float, default=0.1)
+    parser.add_argument("--cache", action="store_true", help="leave the answer cache on")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-p95", type=float, help="fail if p95 latency (s) is above this")
+    parser.add_argument("--max-ttft-p95", type=float, help="fail if p95 time to first token (s) is above this")
+    parser.add_argument("--min-throughput", type=float, help="fail if turns per second is below this")
+    args = parser.parse_args()
+
+    report = run(args)
+    width = max(len(key) for key in report)
+    for key, value in report.items():
+        print(f"{key:<{width}}  {value}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if args.max_p95 is not None and report["latency_p95_s"] > args.max_p95:
+        failures.append(f"p95 latency {report['latency_p95_s']}s > {args.max_p95}s")
+    if args.max_ttft_p95 is not None and report["ttft_p95_s"] > args.max_ttft_p95:
+        failures.append(f"p95 time to first token {report['ttft_p95_s']}s > {args.max_ttft_p95}s")
+    if args.min_throughput is not None and report["throughput_turns_per_s"] < args.min_throughput:
+        failures.append(f"throughput {report['throughput_turns_per_s']}/s < {args.min_throughput}/s")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
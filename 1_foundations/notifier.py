@@ -0,0 +1,152 @@
+import atexit
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+import requests
+
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+
+class Notifier:
+    """ Background Pushover sender: send() spools the message to SQLite and returns immediately
+
+    A worker thread coalesces bursts into one digest, posts it over a pooled session and retries
+    with exponential backoff. Messages stay in the spool until delivered, so a restart resends them.
+
+    Each notifier holds a lease on its rows, renewing `claimed` every lease/3 seconds. Rows whose
+    lease has run out belong to a process that died or restarted, and any notifier adopts them.
+    """
+
+    def __init__(self, url=PUSHOVER_URL, token=None, user=None, spool_path=".cache/notifications.db",
+                 digest_window=3.0, max_batch=10, max_retries=5, backoff=1.0, timeout=10, lease=30.0):
+        self.url = url
+        self.token = token
+        self.user = user
+        self.spool_path = str(spool_path)
+        self.digest_window = digest_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.lease = lease
+        self.session = requests.Session()
+        self.queue = queue.Queue()
+        # Unique across restarts, unlike a PID, which a restarted container usually gets again
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        Path(self.spool_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY, message TEXT, created REAL, owner TEXT, claimed REAL)")
+        self._adopt()
+        self.worker = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self.worker.start()
+        self.heartbeat = threading.Thread(target=self._heartbeat, name="notifier-lease", daemon=True)
+        self.heartbeat.start()
+        atexit.register(self.flush, 2.0)
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        return cls(url=os.getenv("PUSHOVER_URL", PUSHOVER_URL), token=os.getenv("PUSHOVER_TOKEN"), user=os.getenv("PUSHOVER_USER"), **kwargs)
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.spool_path, timeout=10, isolation_level=None))
+
+    def _adopt(self):
+        """ Take over and queue the rows whose owner's lease has expired, so they are not lost """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT id, message FROM spool WHERE owner IS NOT ? AND (claimed IS NULL OR claimed < ?) ORDER BY id",
+                                (self.owner, now - self.lease)).fetchall()
+            conn.executemany("UPDATE spool SET owner = ?, claimed = ? WHERE id = ?", [(self.owner, now, row_id) for row_id, _ in rows])
+            conn.execute("COMMIT")
+        for item in rows:
+            self.queue.put(item)
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                with self._connect() as conn:
+                    conn.execute("UPDATE spool SET claimed = ? WHERE owner = ?", (time.time(), self.owner))
+                self._adopt()
+            except sqlite3.Error as e:
+                print(f"Notification spool lease renewal failed: {e}", flush=True)
+
+    def send(self, message):
+        now = time.time()
+        with self._connect() as conn:
+            row_id = conn.execute("INSERT INTO spool (message, created, owner, claimed) VALUES (?, ?, ?, ?)", (message, now, self.owner, now)).lastrowid
+        self.queue.put((row_id, message))
+
+    def flush(self, timeout=None):
+        """ Wait until everything queued so far has been delivered or given up on """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.digest_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def digest(messages):
+        if len(messages) == 1:
+            return messages[0]
+        return f"{len(messages)} notifications:\n" + "\n".join(f"- {message}" for message in messages)
+
+    def _post(self, text):
+        """ True when delivered, False when the failure is worth retrying """
+        try:
+            response = self.session.post(self.url, data={"token": self.token, "user": self.user, "message": text}, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Push failed: {e}", flush=True)
+            return False
+        if response.status_code == 429 or response.status_code >= 500:
+            print(f"Push failed with status {response.status_code}", flush=True)
+            return False
+        if response.status_code >= 400:
+            # A rejected payload will not succeed on retry; drop it rather than block the queue
+            print(f"Push rejected with status {response.status_code}: {response.text[:200]}", flush=True)
+        return True
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            ids = [row_id for row_id, _ in batch]
+            text = self.digest([message for _, message in batch])
+            delivered = False
+            for attempt in range(self.max_retries):
+                if self._post(text):
+                    delivered = True
+                    break
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+            if delivered:
+                with self._connect() as conn:
+                    conn.executemany("DELETE FROM spool WHERE id = ?", [(row_id,) for row_id in ids])
+            else:
+                # Keep the rows and try again later; they also survive a restart
+                print(f"Giving up on {len(batch)} notifications for now, kept in spool", flush=True)
+                retry = threading.Timer(self.backoff * 2 ** self.max_retries, lambda items=batch: [self.queue.put(item) for item in items])
+                retry.daemon = True
+                retry.start()
+            for _ in batch:
+                self.queue.task_done()
@@ -0,0 +1,141 @@
+""" Page-by-page PDF text extraction: parallel for large files, streamed in page order, cached per page
+
+    for text in iter_pages("resume.pdf"):
+        ...
+
+Small PDFs are parsed in-process. From `pool_from` pages up, page ranges are handed to a process
+pool, each worker opening the file once. Either way pages are yielded in order as soon as they and
+every page before them are ready, and each page's text is written to
+.cache/pdf_pages/<file sha256>.<engine>/ so a file seen before is never parsed again.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ENGINES = ("pypdf", "pdfplumber")
+
+
+def file_digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def page_count(path, engine="pypdf") -> int:
+    if engine == "pdfplumber":
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def iter_range(path, engine, numbers):
+    """ Yield the text of the given pages (0-based), opening the file once """
+    if engine == "pdfplumber":
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            for n in numbers:
+                yield pdf.pages[n].extract_text() or ""
+                # pdfplumber keeps every parsed page's objects otherwise
+                pdf.pages[n].close()
+        return
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    for n in numbers:
+        yield reader.pages[n].extract_text() or ""
+
+
+def extract_range(path, engine, numbers):
+    """ list(iter_range(...)), for pool workers """
+    return list(iter_range(path, engine, numbers))
+
+
+class PageCache:
+    """ One text file per page under a directory named after the PDF's content hash """
+
+    def __init__(self, root, digest, engine):
+        self.dir = Path(root) / f"{digest}.{engine}"
+
+    def count(self):
+        try:
+            return json.loads((self.dir / "meta.json").read_text())["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set_count(self, pages):
+        self._write(self.dir / "meta.json", json.dumps({"pages": pages}))
+
+    def get(self, n):
+        try:
+            return (self.dir / f"{n:05d}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, n, text):
+        self._write(self.dir / f"{n:05d}.txt", text)
+
+    def _write(self, path, text):
+        # Best effort and atomic: a read-only disk just means no cache
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def iter_pages(path, engine="pypdf", cache_dir=".cache/pdf_pages", pool_from=16, workers=None):
+    """
+    Yield the text of each page of a PDF in order.
+
+    Args:
+        engine (str): "pypdf" or "pdfplumber".
+        cache_dir (str): Where per-page text is cached; None disables the cache.
+        pool_from (int): Use a process pool when at least this many pages need parsing.
+        workers (int): Pool size, default os.cpu_count().
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    path = str(path)
+    cache = PageCache(cache_dir, file_digest(path), engine) if cache_dir else None
+    total = cache.count() if cache else None
+    if total is None:
+        total = page_count(path, engine)
+        if cache:
+            cache.set_count(total)
+
+    cached = {n: text for n in range(total) if cache and (text := cache.get(n)) is not None}
+    missing = [n for n in range(total) if n not in cached]
+    workers = workers or os.cpu_count() or 1
+
+    if len(missing) < pool_from or workers < 2:
+        fresh = iter_range(path, engine, missing)
+        for n in range(total):
+            if n not in cached:
+                cached[n] = next(fresh)
+                if cache:
+                    cache.put(n, cached[n])
+            yield cached.pop(n)
+        return
+
+    # Contiguous runs of missing pages, a few per worker so early pages come back first
+    size = max(1, -(-len(missing) // (workers * 4)))
+    chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = {chunk[0]: (chunk, pool.submit(extract_range, path, engine, chunk)) for chunk in chunks}
+        for n in range(total):
+            if n not in cached:
+                chunk, future = futures.pop(n)
+                for number, text in zip(chunk, future.result()):
+                    cached[number] = text
+                    if cache:
+                        cache.put(number, text)
+            yield cached.pop(n)
+
+
+def extract_text(path, separator="\n", **kwargs) -> str:
+    """ Whole-document text from iter_pages, skipping empty pages """
+    return separator.join(text for text in iter_pages(path, **kwargs) if text)
@@ -0,0 +1,88 @@
+""" Extract the LinkedIn PDF once into a compact text artifact that loads without pypdf
+
+The artifact sits next to the PDF (me/linkedin.pdf -> me/linkedin.profile) and is one JSON
+header line followed by the normalized UTF-8 text. Build it ahead of time with:
+
+    python profile_cache.py me/linkedin.pdf
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from pdf_pages import extract_text
+
+ARTIFACT_VERSION = 1
+
+
+def artifact_path(pdf_path) -> Path:
+    return Path(pdf_path).with_suffix(".profile")
+
+
+def file_digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def extract_pdf(pdf_path) -> str:
+    # The artifact is this file's cache, so the per-page cache would only duplicate it
+    return normalize(extract_text(pdf_path, separator="", cache_dir=None))
+
+
+def write_artifact(pdf_path, text, digest, stat):
+    """ Best effort: on a read-only filesystem the app still works, it just parses the PDF each start """
+    header = {"version": ARTIFACT_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+    path = artifact_path(pdf_path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(json.dumps(header).encode("utf-8") + b"\n" + text.encode("utf-8"))
+        # Atomic swap so a concurrently starting worker never reads a half-written artifact
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not write profile artifact {path}: {e}", flush=True)
+
+
+def read_artifact(pdf_path):
+    """ Return (header, text) from the artifact, or (None, None) if it is missing or unreadable """
+    try:
+        with open(artifact_path(pdf_path), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            newline = mm.find(b"\n")
+            header = json.loads(mm[:newline])
+            if header.get("version") != ARTIFACT_VERSION:
+                return None, None
+            return header, mm[newline + 1:].decode("utf-8")
+    except (OSError, ValueError):
+        return None, None
+
+
+def load_profile(pdf_path):
+    """ Return (text, source) where source says whether the artifact or the PDF was used """
+    stat = os.stat(pdf_path)
+    header, text = read_artifact(pdf_path)
+    if header and header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+        return text, "artifact"
+    digest = file_digest(pdf_path)
+    if header and header["sha256"] == digest:
+        # Same content with a new mtime (e.g. a fresh checkout); refresh the header and skip parsing
+        write_artifact(pdf_path, text, digest, stat)
+        return text, "artifact"
+    text = extract_pdf(pdf_path)
+    write_artifact(pdf_path, text, digest, stat)
+    return text, "pdf"
+
+
+if __name__ == "__main__":
+    for pdf in sys.argv[1:] or ["me/linkedin.pdf"]:
+        start = time.perf_counter()
+        text, source = load_profile(pdf)
+        print(f"{artifact_path(pdf)}: {len(text)} chars from {source} in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,80 @@
+import hashlib
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """ An immutable system prompt prefix, built once and reused for every turn """
+    text: str
+    digest: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "digest", hashlib.sha256(self.text.encode("utf-8")).hexdigest())
+
+    @property
+    def cache_key(self) -> str:
+        # Short, stable key so provider-side prompt caching routes every turn to the same prefix
+        return self.digest[:16]
+
+    def messages(self, history, message, *extra):
+        """ Build the message list: the shared prefix first, then the dynamic parts """
+        messages = [{"role": "system", "content": self.text}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": message})
+        messages.extend(extra)
+        return messages
+
+
+def profile_section(summary, linkedin):
+    return f"\n\n## Summary:\n{summary}\n\n## LinkedIn Profile:\n{linkedin}\n\n"
+
+
+# Used instead of profile_section in retrieval mode; the excerpts then arrive with each question
+EXCERPTS_SECTION = "\n\nThe most relevant excerpts of the summary and LinkedIn profile are provided with each question.\n\n"
+
+
+def context_message(chunks):
+    """ The retrieved profile excerpts for one question """
+    excerpts = "\n\n".join(f"[{chunk['source']}]\n{chunk['text']}" for chunk in chunks)
+    return {"role": "system", "content": f"## Relevant profile excerpts:\n{excerpts}"}
+
+
+def chat_prefix(name, profile) -> PromptPrefix:
+    text = f"You are acting as {name}. You are answering questions on {name}'s website, \
+particularly questions related to {name}'s career, background, skills and experience. \
+Your responsibility is to represent {name} for interactions on the website as faithfully as possible. \
+You are given a summary of {name}'s background and LinkedIn profile which you can use to answer questions. \
+Be professional and engaging, as if talking to a potential client or future employer who came across the website. \
+If you don't know the answer to any question, use your record_unknown_question tool to record the question that you couldn't answer, even if it's about something trivial or unrelated to career. \
+If the user is engaging in discussion, try to steer them towards getting in touch via email; ask for their email and record it using your record_user_details tool. Keep the conversation in first person (like they are talking to {name}'s directly)"
+
+    text += profile
+    text += f"With this context, please chat with the user, always staying in character as {name}."
+    return PromptPrefix(text)
+
+
+def evaluator_prefix(name, profile) -> PromptPrefix:
+    text = f"You are an evaluator that decides whether a response to a question is acceptable. \
+You are provided with a conversation between a User and an Agent. Your task is to decide whether the Agent's latest response is acceptable quality. \
+The Agent is playing the role of {name} and is representing {name} on their website. \
+The Agent has been instructed to be professional and engaging, as if talking to a potential client or future employer who came across the website. \
+The Agent has been provided with context on {name} in the form of their summary and LinkedIn details. Here's the information:"
+
+    text += profile
+    text += f"With this context, please evaluate the latest response, replying with whether the response is acceptable and your feedback."
+    return PromptPrefix(text)
+
+
+def rejection_message(reply, feedback):
+    """ The dynamic rejection note for a rerun, appended after the conversation so the cached prefix is untouched """
+    content = "## Previous answer rejected\nYou just tried to reply, but the quality control rejected your reply\n"
+    content += f"## Your attempted answer:\n{reply}\n\n"
+    content += f"## Reason for rejection:\n{feedback}\n\n"
+    return {"role": "system", "content": content}
+
+
+def summary_messages(summary, conversation):
+    """ Ask for the running summary to be extended with turns that left the history window """
+    content = f"Current summary of the conversation:\n{summary or '(none yet)'}\n\nNew turns:\n{conversation}\n\n"
+    content += "Rewrite the summary to include the new turns in under 200 words. Keep names, email addresses, questions asked and commitments made."
+    return [{"role": "user", "content": content}]
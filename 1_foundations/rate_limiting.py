@@ -0,0 +1,152 @@
+"""
+Rate limiting with O(1) work per request and bounded memory.
+
+Two algorithms:
+    TokenBucket(rate, capacity)            - smooth limit with bursts up to `capacity`
+    SlidingWindowCounter(max_requests, window)
+                                           - approximate sliding window from two fixed-window counts
+
+Each keeps a fixed-size state tuple per key instead of a list of timestamps. Keys that have been
+idle long enough to be indistinguishable from a new key are evicted periodically.
+
+Backends:
+    MemoryBackend()       - in-process dict, for a single worker
+    SQLiteBackend(path)   - a SQLite file shared by every worker process on the host
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class MemoryBackend:
+    """ Per-key state in an OrderedDict kept in last-touched order, so eviction only visits idle keys """
+
+    def __init__(self):
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+
+    def apply(self, key, step, now):
+        states = self.states
+        with self.lock:
+            state, allowed = step(states.get(key), now)
+            states[key] = state
+            states.move_to_end(key)
+            return allowed
+
+    def evict(self, cutoff):
+        evicted = 0
+        with self.lock:
+            while self.states:
+                key, state = next(iter(self.states.items()))
+                if state[-1] >= cutoff:
+                    break
+                self.states.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def __len__(self):
+        return len(self.states)
+
+
+class SQLiteBackend:
+    """ Per-key state in a SQLite table; BEGIN IMMEDIATE makes each read-modify-write atomic across processes """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS limits (key TEXT PRIMARY KEY, a REAL, b REAL, c REAL, touched REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS limits_touched ON limits (touched)")
+
+    def _conn(self):
+        # One connection per thread, reused across requests
+        if not hasattr(self.local, "conn"):
+            self.local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self.local.conn.execute("PRAGMA synchronous=NORMAL")
+        return self.local.conn
+
+    def apply(self, key, step, now):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT a, b, c, touched FROM limits WHERE key = ?", (key,)).fetchone()
+            state, allowed = step(row, now)
+            conn.execute("INSERT OR REPLACE INTO limits VALUES (?, ?, ?, ?, ?)", (key, *state))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def evict(self, cutoff):
+        return self._conn().execute("DELETE FROM limits WHERE touched < ?", (cutoff,)).rowcount
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM limits").fetchone()[0]
+
+
+class _Limiter:
+    """ Every algorithm stores a fixed (a, b, c, touched) tuple per key """
+
+    def __init__(self, backend, idle_after):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.idle_after = idle_after
+        self.next_sweep = 0.0
+
+    def _step(self, state, now):
+        """ Return (new state, allowed) given the stored state (None for a new key) """
+        raise NotImplementedError
+
+    def allow(self, key, now=None) -> bool:
+        """ Record a request for `key` and return whether it is within the limit """
+        now = time.time() if now is None else now
+        if now >= self.next_sweep:
+            self.next_sweep = now + self.idle_after
+            self.backend.evict(now - self.idle_after)
+        return self.backend.apply(key, self._step, now)
+
+    def is_rate_limited(self, key) -> bool:
+        return not self.allow(key)
+
+
+class TokenBucket(_Limiter):
+    """ `rate` tokens per second refill a bucket of `capacity`; each request takes one token """
+
+    def __init__(self, rate, capacity, backend=None):
+        # After capacity / rate idle seconds the bucket is full again, the same as a new key
+        super().__init__(backend, idle_after=capacity / rate)
+        self.rate = rate
+        self.capacity = capacity
+
+    def _step(self, state, now):
+        tokens = self.capacity if state is None else min(self.capacity, state[0] + (now - state[1]) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, now, 0, now), True
+        return (tokens, now, 0, now), False
+
+
+class SlidingWindowCounter(_Limiter):
+    """ At most `max_requests` per `window` seconds, weighting the previous window by how much of it still overlaps """
+
+    def __init__(self, max_requests, window, backend=None):
+        super().__init__(backend, idle_after=2 * window)
+        self.max_requests = max_requests
+        self.window = window
+
+    def _step(self, state, now):
+        # state = (window index, count in that window, count in the window before, touched)
+        current = now // self.window
+        if state is None or state[0] < current - 1:
+            count, previous = 0, 0
+        elif state[0] == current - 1:
+            count, previous = 0, state[1]
+        else:
+            count, previous = state[1], state[2]
+        overlap = 1 - (now % self.window) / self.window
+        if previous * overlap + count >= self.max_requests:
+            return (current, count, previous, now), False
+        return (current, count + 1, previous, now), True
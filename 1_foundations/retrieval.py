@@ -0,0 +1,76 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "for", "from", "has", "have", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "so", "that", "the", "their", "this", "to", "was", "what", "when", "which",
+    "who", "with", "you", "your",
+}
+
+
+def tokenize(text):
+    return [word for word in re.findall(r"[a-z0-9][a-z0-9+#.-]*", text.lower()) if word not in STOPWORDS]
+
+
+def chunk_text(text, source, size=800, overlap=150):
+    """ Split text on paragraph boundaries into chunks of roughly `size` characters """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n|\n(?=[A-Z][^\n]{0,60}\n)", text) if p.strip()]
+    chunks, current = [], ""
+    for paragraph in paragraphs:
+        if current and len(current) + len(paragraph) > size:
+            chunks.append(current)
+            current = current[-overlap:] + "\n"
+        current += paragraph + "\n"
+        while len(current) > size * 2:
+            chunks.append(current[:size])
+            current = current[size - overlap:]
+    if current.strip():
+        chunks.append(current)
+    return [{"source": source, "text": chunk.strip()} for chunk in chunks]
+
+
+class ProfileIndex:
+    """ BM25 index over the profile chunks, persisted to disk and rebuilt when the profile changes """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(chunk["text"])) for chunk in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        doc_freq = Counter(term for tf in self.term_freqs for term in tf)
+        n = len(chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    @classmethod
+    def load_or_build(cls, path, profile_hash, sources):
+        """ Load the index from `path` if it was built for `profile_hash`, otherwise chunk `sources` and save it """
+        path = Path(path)
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("profile_hash") == profile_hash:
+                return cls(data["chunks"])
+        chunks = [chunk for source, text in sources.items() for chunk in chunk_text(text, source)]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temp file and swapped in, so workers starting together never read a partial index
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"profile_hash": profile_hash, "chunks": chunks}), encoding="utf-8")
+        os.replace(tmp, path)
+        return cls(chunks)
+
+    def search(self, query, k=4):
+        terms = [term for term in tokenize(query) if term in self.idf]
+        scores = []
+        for i, tf in enumerate(self.term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+            score = sum(self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if t in tf)
+            scores.append((score, i))
+        # Ties (e.g. small talk with no matching terms) fall back to the earliest chunks, which hold the summary
+        scores.sort(key=lambda pair: (-pair[0], pair[1]))
+        # Keep document order in the prompt so the excerpts read naturally
+        return [self.chunks[i] for _, i in sorted(scores[:k], key=lambda pair: pair[1])]
@@ -0,0 +1,119 @@
+""" Production serving mode: several worker processes, each with its own Me, sharing state through SQLite
+
+    python serve.py --workers 4 --port 7860
+
+starts workers on ports 7860..7863. Each worker mounts the Gradio UI at / and a JSON endpoint at
+POST /api/chat on one FastAPI app served by uvicorn. Gradio keeps each visitor's queue state in
+the worker process, so put the ports behind a load balancer with session affinity (for example
+nginx `ip_hash`). /api/chat is stateless and can be balanced freely.
+
+Shared across workers: the answer cache (.cache/answers.db), the notification spool
+(.cache/notifications.db), the per-client rate limit (.cache/rate_limits.db) and the prebuilt
+profile artifact and retrieval index. Per-worker limits are set with environment variables:
+
+    MAX_CONCURRENCY  concurrent replies per worker (default 8)
+    QUEUE_SIZE       visitors allowed to wait in a worker's Gradio queue (default 64)
+    RATE_LIMIT       messages per minute per client IP (default 20)
+    PROXY_HOPS       trusted proxies in front of the workers; 0 ignores X-Forwarded-For (default 0)
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import gradio as gr
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel
+
+RATE_LIMITED = "You're sending messages too quickly. Please wait a moment before sending another message."
+
+
+class ChatRequest(BaseModel):
+    message: str
+    history: list[dict] = []
+
+
+def client_id(request, hops=None):
+    """ The client's IP: the address our nearest trusted proxy saw, never one the client wrote itself """
+    hops = int(os.getenv("PROXY_HOPS", "0")) if hops is None else hops
+    forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+    if hops > 0 and forwarded:
+        # Each trusted proxy appends the address it received from; anything before that is the client's say-so
+        return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def create_app():
+    """ Build one worker's app; uvicorn calls this in each worker process (--factory) """
+    from ai_resume_app import Me, build_ui
+    from rate_limiting import SlidingWindowCounter, SQLiteBackend
+    from llm_clients import clients
+
+    max_concurrency = int(os.getenv("MAX_CONCURRENCY", "8"))
+    me = Me()
+    limiter = SlidingWindowCounter(int(os.getenv("RATE_LIMIT", "20")), 60, backend=SQLiteBackend(".cache/rate_limits.db"))
+    slots = threading.BoundedSemaphore(max_concurrency)
+
+    def respond(message, history, request: gr.Request):
+        if not limiter.allow(client_id(request)):
+            yield RATE_LIMITED
+            return
+        yield from me.chat_stream(message, history)
+
+    app = FastAPI()
+
+    @app.get("/healthz")
+    def healthz():
+        return {"ok": True, "pid": os.getpid()}
+
+    @app.get("/metrics")
+    def metrics():
+        # Per-provider request counts, errors and latency for this worker's LLM clients
+        return {"pid": os.getpid(), "providers": clients.stats()}
+
+    @app.post("/api/chat")
+    def chat(body: ChatRequest, request: Request):
+        if not limiter.allow(client_id(request)):
+            raise HTTPException(status_code=429, detail=RATE_LIMITED)
+        with slots:
+            return {"reply": me.chat(body.message, body.history)}
+
+    demo = build_ui(me, respond).queue(default_concurrency_limit=max_concurrency, max_size=int(os.getenv("QUEUE_SIZE", "64")))
+    return gr.mount_gradio_app(app, demo, path="/")
+
+
+def launch(workers, host, port):
+    """ Start one uvicorn process per port and restart any that exit """
+    def start(i):
+        return subprocess.Popen([sys.executable, "-m", "uvicorn", "serve:create_app", "--factory", "--host", host,
+                                 "--port", str(port + i), "--log-level", "warning"], cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    # Turn SIGTERM into SystemExit so the finally block below stops the workers too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    processes = [start(i) for i in range(workers)]
+    print(f"Serving {workers} workers on {host}:{port}-{port + workers - 1}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+            for i, process in enumerate(processes):
+                if process.poll() is not None:
+                    print(f"Worker on port {port + i} exited with {process.returncode}, restarting", flush=True)
+                    processes[i] = start(i)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "2")))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7860)
+    args = parser.parse_args()
+    launch(args.workers, args.host, args.port)
@@ -0,0 +1,73 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pydantic import ConfigDict, ValidationError, create_model
+
+JSON_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool, "array": list, "object": dict}
+
+
+def compile_schema(schema):
+    """ Turn a function's JSON schema into a pydantic model once, so validating a call is cheap """
+    parameters = schema.get("parameters", {})
+    required = set(parameters.get("required", []))
+    fields = {}
+    for name, spec in parameters.get("properties", {}).items():
+        python_type = JSON_TYPES.get(spec.get("type"), object)
+        fields[name] = (python_type, ...) if name in required else (python_type | None, None)
+    extra = "forbid" if parameters.get("additionalProperties") is False else "ignore"
+    return create_model(f"{schema['name']}_arguments", __config__=ConfigDict(extra=extra), **fields)
+
+
+class ToolRegistry:
+    """ Explicit name -> callable mapping for the model's tools, with validated, concurrent dispatch """
+
+    def __init__(self, max_workers=4, timeout=10.0):
+        self.timeout = timeout
+        self.tools = {}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def register(self, function, schema, timeout=None):
+        self.tools[schema["name"]] = (function, compile_schema(schema), schema, timeout or self.timeout)
+        return function
+
+    def specs(self):
+        return [{"type": "function", "function": schema} for _, _, schema, _ in self.tools.values()]
+
+    def _prepare(self, tool_call):
+        """ Return (function, kwargs, timeout) or an error result for the model """
+        name = tool_call.function.name
+        if name not in self.tools:
+            return {"error": f"Unknown tool {name}"}
+        function, model, _, timeout = self.tools[name]
+        try:
+            arguments = model.model_validate_json(tool_call.function.arguments or "{}")
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'arguments'}: {error['msg']}" for error in e.errors())
+            return {"error": f"Invalid arguments for {name}: {problems}"}
+        # Leave out arguments the model did not send so the function's own defaults apply
+        return function, arguments.model_dump(exclude_unset=True), timeout
+
+    def dispatch(self, tool_calls):
+        """ Run the tool calls concurrently and return the tool messages in the order they were called """
+        pending = []
+        for tool_call in tool_calls:
+            print(f"Tool called: {tool_call.function.name}", flush=True)
+            prepared = self._prepare(tool_call)
+            if isinstance(prepared, dict):
+                pending.append((tool_call, None, prepared, 0))
+            else:
+                function, kwargs, timeout = prepared
+                pending.append((tool_call, self.pool.submit(function, **kwargs), None, time.monotonic() + timeout))
+
+        results = []
+        for tool_call, future, result, deadline in pending:
+            if future is not None:
+                try:
+                    result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeout:
+                    result = {"error": f"{tool_call.function.name} timed out"}
+                except Exception as e:
+                    print(f"Tool {tool_call.function.name} failed: {e}", flush=True)
+                    result = {"error": str(e)}
+            results.append({"role": "tool", "content": json.dumps(result), "tool_call_id": tool_call.id})
+        return results
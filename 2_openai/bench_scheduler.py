@@ -0,0 +1,106 @@
+""" Compare launching every search at once with the shared call scheduler, against a rate-limited fake provider
+
+    python bench_scheduler.py --users 4 --searches 10 --limit 20
+
+The fake provider accepts --limit calls per --window seconds and answers 429 beyond that; each call
+takes ~--latency seconds. `unbounded` is the old perform_searches: every search as a task at once,
+no retries. `scheduler` goes through call_scheduler with the provider's limit as its rate. The last
+part starts a batch run of --batch searches and, a moment later, one interactive run, and times the
+interactive run when both share the same priority and when the scheduler puts it first.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+import httpx
+import openai
+from call_scheduler import Scheduler, INTERACTIVE, BATCH
+
+
+class FakeProvider:
+    def __init__(self, limit, window, latency, seed=0):
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.started = deque()
+        self.rng = random.Random(seed)
+        self.rejected = 0
+
+    async def call(self):
+        now = time.monotonic()
+        while self.started and now - self.started[0] > self.window:
+            self.started.popleft()
+        if len(self.started) >= self.limit:
+            self.rejected += 1
+            response = httpx.Response(429, request=httpx.Request("POST", "https://fake.invalid/v1/responses"))
+            raise openai.RateLimitError("rate limited", response=response, body=None)
+        self.started.append(now)
+        await asyncio.sleep(self.latency * self.rng.lognormvariate(0, 0.3))
+        return "summary"
+
+
+async def unbounded(provider, searches):
+    results = await asyncio.gather(*(provider.call() for _ in range(searches)), return_exceptions=True)
+    return sum(not isinstance(r, Exception) for r in results)
+
+
+async def scheduled(scheduler, provider, searches, priority=INTERACTIVE):
+    async def search():
+        return await scheduler.run("fake", provider.call, priority)
+    results = await asyncio.gather(*(search() for _ in range(searches)), return_exceptions=True)
+    return sum(not isinstance(r, Exception) for r in results)
+
+
+def make_scheduler(args):
+    return Scheduler(max_concurrency=args.concurrency, rate_limits={"fake": args.limit / args.window * 60},
+                     burst=args.burst, retries=args.retries, base_delay=args.window / 4, max_delay=args.window * 4)
+
+
+async def fan_out(args, flow):
+    provider = FakeProvider(args.limit, args.window, args.latency)
+    scheduler = make_scheduler(args)
+    start = time.perf_counter()
+    if flow == "unbounded":
+        done = await asyncio.gather(*(unbounded(provider, args.searches) for _ in range(args.users)))
+    else:
+        done = await asyncio.gather(*(scheduled(scheduler, provider, args.searches) for _ in range(args.users)))
+    total = args.users * args.searches
+    print(f"{flow:<10} {sum(done):4d}/{total} searches succeeded   {time.perf_counter() - start:5.2f}s   "
+          f"429s from the provider: {provider.rejected}")
+
+
+async def mixed(args, batch_priority):
+    provider = FakeProvider(args.limit, args.window, args.latency)
+    scheduler = make_scheduler(args)
+    batch = asyncio.create_task(scheduled(scheduler, provider, args.batch, batch_priority))
+    await asyncio.sleep(args.latency / 2)
+    start = time.perf_counter()
+    await scheduled(scheduler, provider, args.searches, INTERACTIVE)
+    elapsed = time.perf_counter() - start
+    await batch
+    return elapsed
+
+
+async def main(args):
+    await fan_out(args, "unbounded")
+    await fan_out(args, "scheduler")
+    same = statistics.median([await mixed(args, INTERACTIVE) for _ in range(args.runs)])
+    first = statistics.median([await mixed(args, BATCH) for _ in range(args.runs)])
+    print(f"interactive run next to a {args.batch}-search batch: {same:.2f}s at equal priority, {first:.2f}s with batch at BATCH priority")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=4, help="concurrent research runs")
+    parser.add_argument("--searches", type=int, default=10, help="searches per run")
+    parser.add_argument("--batch", type=int, default=30, help="searches in the background batch run")
+    parser.add_argument("--limit", type=int, default=20, help="calls the provider accepts per window")
+    parser.add_argument("--window", type=float, default=1.0, help="provider rate window in seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
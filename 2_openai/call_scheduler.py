@@ -0,0 +1,262 @@
+""" One async scheduler for the search and LLM calls of every deep research app in a process
+
+    from call_scheduler import scheduler, run_all, BATCH
+    result = await scheduler.run_agent(search_agent, input)
+    result = await scheduler.run_agent(writer_agent, input, priority=BATCH)
+    summaries, failures = await run_all(search, search_plan.searches)
+
+Every call waits for a token from its model's bucket, then for one of the global slots, and is
+retried with jittered exponential backoff when the provider answers 429, 5xx or times out. A 429
+also halves that model's rate for a while, which then creeps back up as calls succeed. Interactive
+callers are always served before batch callers waiting on the same bucket or slot. Configured from
+the environment:
+
+    SCHEDULER_MAX_CONCURRENCY  calls in flight across all models (default 8)
+    SCHEDULER_RPM              requests per minute per model when not listed below (default 300)
+    SCHEDULER_RATE_LIMITS      per-model overrides, e.g. "gpt-4o-mini=500,gpt-4o=60"
+    SCHEDULER_BURST            bucket capacity, calls that may start back to back (default 5)
+    SCHEDULER_RETRIES          retries after the first attempt (default 4)
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+import openai
+
+INTERACTIVE, BATCH = 0, 1
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """ Seconds the provider asked us to wait, from the Retry-After header if there is one """
+    response = getattr(exc, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def model_key(agent) -> str:
+    """ The bucket an agent's calls count against: its model name """
+    model = agent.model
+    if model is None:
+        return "default"
+    return model if isinstance(model, str) else getattr(model, "model", type(model).__name__)
+
+
+class PriorityQueueGate:
+    """ Waiters ordered by (priority, arrival); subclasses decide when the head may go """
+
+    def __init__(self):
+        self.waiting = []
+        self.changed = asyncio.Condition()
+        self.arrivals = itertools.count()
+
+    async def _wait_turn(self, priority, ready):
+        """ Wait until this caller is first in line and ready() returns 0, otherwise the seconds to wait """
+        ticket = (priority, next(self.arrivals))
+        async with self.changed:
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while True:
+                    delay = ready() if self.waiting[0] == ticket else None
+                    if delay == 0:
+                        heapq.heappop(self.waiting)
+                        return
+                    try:
+                        await asyncio.wait_for(self.changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                if ticket in self.waiting:
+                    self.waiting.remove(ticket)
+                    heapq.heapify(self.waiting)
+                self.changed.notify_all()
+
+    async def _notify(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+
+class PrioritySemaphore(PriorityQueueGate):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    async def acquire(self, priority=INTERACTIVE):
+        def ready():
+            if self.value > 0:
+                self.value -= 1
+                return 0
+            return None
+        await self._wait_turn(priority, ready)
+
+    async def release(self):
+        self.value += 1
+        await self._notify()
+
+
+class TokenBucket(PriorityQueueGate):
+    """ `rate` calls per second on average, up to `capacity` back to back, with the rate cut on 429s """
+
+    def __init__(self, rate, capacity):
+        super().__init__()
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority=INTERACTIVE):
+        def ready():
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+        await self._wait_turn(priority, ready)
+
+    def throttle(self):
+        """ Called on a 429: halve the rate (down to a tenth of the configured one) and drop the burst """
+        self._refill()
+        self.rate = max(self.max_rate / 10, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+
+    def recover(self):
+        """ Called on success: win back a twentieth of the configured rate """
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class Scheduler:
+    def __init__(self, max_concurrency=8, rpm=300, rate_limits=None, burst=5, retries=4, base_delay=1.0, max_delay=30.0):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.rate_limits = rate_limits or {}
+        self.burst = burst
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+        # asyncio primitives belong to one event loop, so each loop gets its own slots and buckets
+        self.loops = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls):
+        limits = {}
+        for entry in os.getenv("SCHEDULER_RATE_LIMITS", "").split(","):
+            if "=" in entry:
+                model, rpm = entry.split("=", 1)
+                limits[model.strip()] = float(rpm)
+        return cls(
+            max_concurrency=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "8")),
+            rpm=float(os.getenv("SCHEDULER_RPM", "300")),
+            rate_limits=limits,
+            burst=int(os.getenv("SCHEDULER_BURST", "5")),
+            retries=int(os.getenv("SCHEDULER_RETRIES", "4")),
+        )
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self.loops:
+            self.loops[loop] = (PrioritySemaphore(self.max_concurrency), {})
+        return self.loops[loop]
+
+    def bucket(self, key) -> TokenBucket:
+        buckets = self._state()[1]
+        if key not in buckets:
+            buckets[key] = TokenBucket(self.rate_limits.get(key, self.rpm) / 60, self.burst)
+        return buckets[key]
+
+    @asynccontextmanager
+    async def slot(self, key, priority=INTERACTIVE):
+        """ Hold a rate-limited slot for one call, e.g. a streamed completion that cannot be retried """
+        await self.bucket(key).acquire(priority)
+        slots = self._state()[0]
+        await slots.acquire(priority)
+        self.calls += 1
+        try:
+            yield
+        finally:
+            await slots.release()
+
+    def backoff(self, attempt, exc) -> float:
+        """ Full jitter: a random wait up to the exponential cap, but at least what Retry-After asked for """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after(exc) or 0)
+
+    async def run(self, key, call, priority=INTERACTIVE):
+        """ Await call() under the `key` bucket and a global slot, retrying retryable errors and re-raising the last one """
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.slot(key, priority):
+                    result = await call()
+            except Exception as exc:
+                if not is_retryable(exc):
+                    self.failed += 1
+                    raise
+                if getattr(exc, "status_code", None) == 429:
+                    self.bucket(key).throttle()
+                if attempt == self.retries:
+                    self.failed += 1
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.backoff(attempt, exc))
+            else:
+                self.bucket(key).recover()
+                return result
+
+    async def run_agent(self, agent, input, priority=INTERACTIVE, **kwargs):
+        """ Runner.run(agent, input) through the scheduler, keyed by the agent's model """
+        from agents import Runner
+        return await self.run(model_key(agent), lambda: Runner.run(agent, input, **kwargs), priority)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "retried": self.retried, "failed": self.failed}
+
+
+async def run_all(call, items, label="Searching"):
+    """ Await call(item) for every item at once; return (results in completion order, [(item, exception)])
+
+    Failures are printed rather than dropped, and if every call fails the first failure is raised.
+    """
+    tasks = {asyncio.create_task(call(item)): item for item in items}
+    results, failures = [], []
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    failures.append((tasks[task], task.exception()))
+                    print(f"{label}: {tasks[task]!r} failed with {task.exception()!r}", flush=True)
+                else:
+                    results.append(task.result())
+                print(f"{label}... {len(results) + len(failures)}/{len(tasks)} completed", flush=True)
+    finally:
+        for task in pending:
+            task.cancel()
+    if failures and not results:
+        raise RuntimeError(f"All {len(tasks)} calls failed") from failures[0][1]
+    return results, failures
+
+
+scheduler = Scheduler.from_env()
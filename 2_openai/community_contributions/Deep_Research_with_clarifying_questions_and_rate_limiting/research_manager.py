@@ -1,10 +1,15 @@
-from agents import Runner, trace, gen_trace_id
+from agents import trace, gen_trace_id
 from search_agent import search_agent
 from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
 from writer_agent import writer_agent, ReportData
 from email_agent import email_agent
-import asyncio
 from typing import Optional
+from pathlib import Path
+import sys
+
+# shared call scheduler from 2_openai/call_scheduler.py
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from call_scheduler import scheduler, run_all
 
 class ResearchManagerAgent:
 
@@ -55,7 +60,7 @@ class ResearchManagerAgent:
         )
         final_prompt = f"Query: {query}\nClarifications:\n{clarifying_context}"
 
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             planner_agent,
             input=final_prompt,
         )
@@ -65,36 +70,24 @@ class ResearchManagerAgent:
     async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
         """ Perform the searches for the planned queries """
         print("Searching...")
-        num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
-        results = []
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if result is not None:
-                results.append(result)
-            num_completed += 1
-            print(f"Searching... {num_completed}/{len(tasks)} completed")
-        print("Finished searching")
+        results, failures = await run_all(self.search, search_plan.searches)
+        print(f"Finished searching, {len(failures)} failed")
         return results
 
-    async def search(self, item: WebSearchItem) -> Optional[str]:
+    async def search(self, item: WebSearchItem) -> str:
         """ Perform a single web search """
         input_text = f"Search term: {item.query}\nReason for searching: {item.reason}"
-        try:
-            result = await Runner.run(
-                search_agent,
-                input_text,
-            )
-            return str(result.final_output)
-        except Exception as e:
-            print(f"Search failed: {e}")
-            return None
+        result = await scheduler.run_agent(
+            search_agent,
+            input_text,
+        )
+        return str(result.final_output)
 
     async def write_report(self, query: str, search_results: list[str]) -> ReportData:
         """ Write a markdown report from search results """
         print("Thinking about report...")
         input_text = f"Original query: {query}\nSummarized search results: {search_results}"
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             writer_agent,
             input_text,
         )
@@ -110,5 +103,5 @@ class ResearchManagerAgent:
         {report.markdown_report}
         """
         print(f"Sending email to: {recipient_email}")
-        await Runner.run(email_agent, input=email_prompt)
+        await scheduler.run_agent(email_agent, input=email_prompt)
         print("✅ Email sent")
\ No newline at end of file
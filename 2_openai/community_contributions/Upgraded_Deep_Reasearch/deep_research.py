@@ -2,12 +2,17 @@
 
 import gradio as gr
 from dotenv import load_dotenv
-from agents import Runner
 from clarifier_agent import clarifier_agent
 from planner_agent import planner_agent
 from search_agent import search_agent
 from writer_agent import writer_agent
 from email_agent import email_agent   # ← import the Agent here
+from pathlib import Path
+import sys
+
+# shared call scheduler from 2_openai/call_scheduler.py
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from call_scheduler import scheduler, run_all
 
 # Load environment variables (e.g., SENDGRID_API_KEY)
 load_dotenv(override=True)
@@ -20,7 +25,7 @@ async def run(query: str, answers: str, state: list[str]):
     """
     # Phase 1: Clarify
     if not state:
-        clar = await Runner.run(clarifier_agent, query)
+        clar = await scheduler.run_agent(clarifier_agent, query)
         questions = clar.final_output.questions
         qtext = "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
         return qtext, gr.update(visible=True), questions
@@ -34,24 +39,25 @@ async def run(query: str, answers: str, state: list[str]):
     planner_input = f"Original query: {query}\nClarifications:\n" + "\n".join(answered)
 
     # 2) Generate search plan
-    plan_res = await Runner.run(planner_agent, planner_input)
+    plan_res = await scheduler.run_agent(planner_agent, planner_input)
     searches = plan_res.final_output.searches
 
-    # 3) Run each search and collect summaries
-    summaries = []
-    for item in searches:
-        search_res = await Runner.run(search_agent, item.query)
-        summaries.append(str(search_res.final_output))
+    # 3) Run the searches concurrently through the shared scheduler and collect summaries
+    async def search(item):
+        search_res = await scheduler.run_agent(search_agent, item.query)
+        return str(search_res.final_output)
+    summaries, failures = await run_all(search, searches)
+    print(f"Finished searching, {len(failures)} failed")
 
     # 4) Write the full report
     writer_input = f"Original query: {query}\nSummaries: {summaries}"
-    write_res = await Runner.run(writer_agent, writer_input)
+    write_res = await scheduler.run_agent(writer_agent, writer_input)
     report_data = write_res.final_output
     report_md = report_data.markdown_report
 
     # 5) Email the report
     # Pass the markdown report as the “detailed report” prompt to the email agent
-    await Runner.run(email_agent, report_md)
+    await scheduler.run_agent(email_agent, report_md)
 
     # Return the markdown report and hide the answers box
     return report_md, gr.update(visible=False), []
@@ -1,10 +1,15 @@
-from agents import Runner, trace, gen_trace_id
+from agents import trace, gen_trace_id
 from search_agent import search_agent
 from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
 from writer_agent import writer_agent, ReportData
 from email_agent import email_agent
 from clarify_agent import clarify_agent
-import asyncio
+from pathlib import Path
+import sys
+
+# shared call scheduler from 2_openai/call_scheduler.py
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from call_scheduler import scheduler, run_all
 
 class ResearchManager:
 
@@ -29,7 +34,7 @@ class ResearchManager:
     async def plan_searches(self, query: str) -> WebSearchPlan:
         """ Plan the searches to perform for the query """
         print("Planning searches...")
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             planner_agent,
             f"Query: {query}",
         )
@@ -39,35 +44,24 @@ class ResearchManager:
     async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
         """ Perform the searches to perform for the query """
         print("Searching...")
-        num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
-        results = []
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if result is not None:
-                results.append(result)
-            num_completed += 1
-            print(f"Searching... {num_completed}/{len(tasks)} completed")
-        print("Finished searching")
+        results, failures = await run_all(self.search, search_plan.searches)
+        print(f"Finished searching, {len(failures)} failed")
         return results
 
-    async def search(self, item: WebSearchItem) -> str | None:
+    async def search(self, item: WebSearchItem) -> str:
         """ Perform a search for the query """
         input = f"Search term: {item.query}\nReason for searching: {item.reason}"
-        try:
-            result = await Runner.run(
-                search_agent,
-                input,
-            )
-            return str(result.final_output)
-        except Exception:
-            return None
+        result = await scheduler.run_agent(
+            search_agent,
+            input,
+        )
+        return str(result.final_output)
 
     async def write_report(self, query: str, search_results: list[str]) -> ReportData:
         """ Write the report for the query """
         print("Thinking about report...")
         input = f"Original query: {query}\nSummarized search results: {search_results}"
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             writer_agent,
             input,
         )
@@ -77,7 +71,7 @@ class ResearchManager:
     
     async def send_email(self, report: ReportData) -> None:
         print("Writing email...")
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             email_agent,
             report.markdown_report,
         )
@@ -89,7 +83,7 @@ class ResearchManager:
         print("Generating clarification questions...")
         input = f"Please analyze this research query and generate 3 clarifying questions that would help focus the research: {query}"
         try: 
-            questions = await Runner.run(
+            questions = await scheduler.run_agent(
                 clarify_agent, 
                 input
             )
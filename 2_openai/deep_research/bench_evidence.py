@@ -0,0 +1,71 @@
+""" Writer input size with the raw search summaries versus the evidence pack, as the number of searches grows
+
+    python bench_evidence.py --searches 5 10 30 60 --budget 6000
+
+Summaries are synthetic: each search reports --facts-per-search facts drawn from a shared pool of
+--pool facts about one topic, reworded slightly, so searches overlap the way real ones do. The
+condense step is replaced by one that keeps every other fact after a --condense-latency sleep, so
+no API key is needed; the merge rounds and their timing are real.
+"""
+import argparse
+import asyncio
+import random
+import time
+from evidence import build_evidence_pack, count_tokens
+
+SUBJECTS = ["Open-weight models", "Agent frameworks", "Inference costs", "GPU supply", "Context windows", "Fine-tuning",
+            "Evaluation suites", "Enterprise adoption", "Regulation in the EU", "Retrieval pipelines", "Tool calling", "Safety research"]
+VERBS = ["grew", "fell", "doubled", "stalled", "shifted", "accelerated"]
+FILLER = ["notably", "reportedly", "per analysts", "in 2025", "year over year", "according to surveys"]
+
+
+def fact_pool(size, rng):
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} by {rng.randint(5, 95)}% across {rng.randint(2, 40)} "
+            f"vendors tracked by {rng.choice(['Gartner', 'IDC', 'Stanford HAI', 'Epoch AI', 'a16z'])} (item {i})" for i in range(size)]
+
+
+def reword(fact, rng):
+    words = fact.split()
+    if rng.random() < 0.5:
+        words.insert(rng.randint(1, len(words) - 1), rng.choice(FILLER))
+    return " ".join(words) + "."
+
+
+def summaries(searches, pool, per_search, rng):
+    result = []
+    for _ in range(searches):
+        facts = [reword(fact, rng) for fact in rng.sample(pool, per_search)]
+        paragraphs = [" ".join(facts[i:i + 4]) for i in range(0, len(facts), 4)]
+        result.append("\n\n".join(paragraphs))
+    return result
+
+
+async def main(args):
+    rng = random.Random(0)
+    pool = fact_pool(args.pool, rng)
+
+    async def condense(facts):
+        await asyncio.sleep(args.condense_latency)
+        return facts[::2]
+
+    print(f"{'searches':>8} {'raw tokens':>11} {'pack tokens':>12} {'facts':>6} {'rounds':>7} {'dropped':>8} {'time':>7}")
+    for n in args.searches:
+        texts = summaries(n, pool, args.facts_per_search, rng)
+        start = time.perf_counter()
+        pack = await build_evidence_pack(texts, budget=args.budget, chunk_budget=args.chunk_budget, condense=condense)
+        elapsed = time.perf_counter() - start
+        # What write_report used to send: the repr of the list of summaries
+        raw = count_tokens(f"Summarized search results: {texts}")
+        stats = pack.stats()
+        print(f"{n:>8} {raw:>11} {stats['pack_tokens']:>12} {stats['facts']:>6} {stats['merge_rounds']:>7} {stats['dropped_facts']:>8} {elapsed:>6.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, nargs="+", default=[5, 10, 30, 60])
+    parser.add_argument("--pool", type=int, default=150)
+    parser.add_argument("--facts-per-search", type=int, default=12)
+    parser.add_argument("--budget", type=int, default=6000)
+    parser.add_argument("--chunk-budget", type=int, default=3000)
+    parser.add_argument("--condense-latency", type=float, default=2.0, help="seconds per simulated condense call")
+    asyncio.run(main(parser.parse_args()))
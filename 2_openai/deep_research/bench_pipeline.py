@@ -0,0 +1,97 @@
+""" Compare the barrier flow (all searches, then one writer call) with the pipelined section flow
+
+    python bench_pipeline.py --runs 20 --searches 5 --scale 0.1
+
+Agent calls are replaced by sleeps, so no API key is needed. The defaults are rough gpt-4o-mini
+timings: a search takes ~4s with a 20% chance of a 4x slow tail, the one-shot writer ~6s plus ~2s
+per search it has to cover, a section ~5s and the merge pass ~4s. --scale shrinks every delay.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from agents import set_tracing_disabled
+from pipeline import QuorumPolicy
+from planner_agent import WebSearchItem, WebSearchPlan
+from research_manager import ResearchManager
+from writer_agent import MergedReport, ReportData, assemble_report
+
+
+class MockResearchManager(ResearchManager):
+    def __init__(self, args, rng, **kwargs):
+        super().__init__(**kwargs)
+        self.args = args
+        self.rng = rng
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds * self.args.scale)
+
+    async def search(self, item):
+        slow = self.args.slow_factor if self.rng.random() < self.args.slow_rate else 1
+        await self.sleep(self.rng.lognormvariate(0, 0.3) * self.args.search * slow)
+        return f"summary of {item.query}"
+
+    async def write_report(self, query, search_results):
+        await self.sleep(self.args.writer + self.args.writer_per_search * len(search_results))
+        return ReportData(short_summary="", markdown_report="\n\n".join(search_results), follow_up_questions=[])
+
+    async def write_section(self, query, item, summary):
+        await self.sleep(self.args.section * self.rng.uniform(0.8, 1.2))
+        return f"## {item.query}\n\n{summary}"
+
+    async def merge_sections(self, query, sections):
+        await self.sleep(self.args.merge)
+        return assemble_report(MergedReport(title=query, introduction="", conclusion="", short_summary="", follow_up_questions=[]), sections)
+
+
+async def barrier(manager, plan):
+    results = await manager.perform_searches(plan)
+    await manager.write_report("query", results)
+    return len(results)
+
+
+async def pipelined(manager, plan):
+    async for update in manager.run_pipelined("query", plan):
+        report = update
+    return report.markdown_report.count("\n## ") - 1
+
+
+async def main(args):
+    plan = WebSearchPlan(searches=[WebSearchItem(reason="r", query=f"search {i}") for i in range(args.searches)])
+    policy = QuorumPolicy(quorum=args.quorum, grace=args.grace * args.scale, deadline=args.deadline * args.scale)
+    timings = {"barrier": [], "pipelined": []}
+    used = {"barrier": [], "pipelined": []}
+    for run in range(args.runs):
+        for name, flow in (("barrier", barrier), ("pipelined", pipelined)):
+            # Same seed for both flows, so they see the same search latencies
+            manager = MockResearchManager(args, random.Random(run), pipelined=True, policy=policy, use_search_cache=False)
+            start = time.perf_counter()
+            used[name].append(await flow(manager, plan))
+            timings[name].append((time.perf_counter() - start) / args.scale)
+
+    for name, values in timings.items():
+        print(f"{name:<10} median {statistics.median(values):6.1f}s   p90 {sorted(values)[int(0.9 * len(values))]:6.1f}s   "
+              f"max {max(values):6.1f}s   searches used {statistics.mean(used[name]):.1f}/{args.searches}")
+    gain = 1 - statistics.median(timings["pipelined"]) / statistics.median(timings["barrier"])
+    print(f"median end-to-end latency {gain:.0%} lower with the pipeline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--searches", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiply every simulated delay by this")
+    parser.add_argument("--search", type=float, default=4.0)
+    parser.add_argument("--slow-rate", type=float, default=0.2)
+    parser.add_argument("--slow-factor", type=float, default=4.0)
+    parser.add_argument("--writer", type=float, default=6.0)
+    parser.add_argument("--writer-per-search", type=float, default=2.0)
+    parser.add_argument("--section", type=float, default=5.0)
+    parser.add_argument("--merge", type=float, default=4.0)
+    parser.add_argument("--quorum", type=float, default=0.8)
+    parser.add_argument("--grace", type=float, default=3.0)
+    parser.add_argument("--deadline", type=float, default=60.0)
+    args = parser.parse_args()
+    set_tracing_disabled(True)
+    asyncio.run(main(args))
@@ -1,3 +1,4 @@
+import os
 import gradio as gr
 from dotenv import load_dotenv
 from research_manager import ResearchManager
@@ -6,7 +7,8 @@ load_dotenv(override=True)
 
 
 async def run(query: str):
-    async for chunk in ResearchManager().run(query):
+    # RESEARCH_MODE=pipelined writes a section per search while the other searches run
+    async for chunk in ResearchManager(pipelined=os.getenv("RESEARCH_MODE") == "pipelined").run(query):
         yield chunk
 
 
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from pydantic import BaseModel, Field
+from agents import Agent
+
+STOPWORDS = {"a", "an", "the", "of", "for", "in", "on", "to", "and", "or", "with", "by", "at", "as", "from", "is",
+             "are", "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "which", "has", "have"}
+
+
+def count_tokens(text: str) -> int:
+    """ Rough token count, ~4 characters a token for English; close enough for budgeting """
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Fact:
+    text: str
+    sources: list[int]  # 1-based numbers of the searches that reported it
+    words: frozenset = field(init=False, repr=False)
+    numbers: frozenset = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.words = frozenset(w.strip(".") for w in re.findall(r"[a-z0-9%$.]+", self.text.lower()) if w.strip(".") not in STOPWORDS)
+        self.numbers = frozenset(w for w in self.words if any(c.isdigit() for c in w))
+
+
+def split_facts(summary: str, source: int, min_words: int = 4) -> list[Fact]:
+    """ One Fact per bullet, line or sentence of a search summary, dropping fragments shorter than min_words unless they quote a number """
+    facts = []
+    for line in summary.splitlines():
+        line = re.sub(r"^\s*(?:[-*•]|\d+[.)]|#+)\s*", "", line).strip()
+        for sentence in re.split(r"(?<=[.!?;])\s+(?=[A-Z0-9\"'(])", line):
+            fact = Fact(sentence.strip(), [source])
+            if fact.words and (fact.numbers or len(fact.text.split()) >= min_words):
+                facts.append(fact)
+    return facts
+
+
+def dedupe(facts: list[Fact], threshold: float = 0.6) -> list[Fact]:
+    """ Merge facts whose word sets overlap by at least `threshold` (Jaccard), keeping the longer wording and all sources
+
+    Only facts quoting exactly the same numbers are merged, so no figure is lost with the shorter wording.
+    """
+    kept: list[Fact] = []
+    for fact in facts:
+        for other in kept:
+            if fact.numbers != other.numbers:
+                continue
+            union = len(fact.words | other.words)
+            if union and len(fact.words & other.words) / union >= threshold:
+                if len(fact.text) > len(other.text):
+                    other.text, other.words = fact.text, fact.words
+                other.sources = sorted(set(other.sources) | set(fact.sources))
+                break
+        else:
+            kept.append(fact)
+    return kept
+
+
+def render(facts: list[Fact]) -> str:
+    return "\n".join(f"- {fact.text} [{', '.join(map(str, fact.sources))}]" for fact in facts)
+
+
+class CondensedFact(BaseModel):
+    text: str = Field(description="One self-contained fact, keeping any names, numbers and dates.")
+
+    sources: list[int] = Field(description="The source numbers of every input fact merged into this one.")
+
+
+class CondensedFacts(BaseModel):
+    facts: list[CondensedFact]
+
+
+CONDENSE_INSTRUCTIONS = (
+    "You condense research notes for a report writer. You will be given a list of facts, each ending with "
+    "the numbers of the searches that reported it in square brackets. Merge facts that say the same thing, "
+    "drop fluff and anything not useful for the research query, and shorten the wording, but keep every "
+    "name, number and date. Return at most half as many facts as you were given, each with the union of "
+    "the source numbers of the facts it came from."
+)
+
+condense_agent = Agent(
+    name="CondenseAgent",
+    instructions=CONDENSE_INSTRUCTIONS,
+    model="gpt-4o-mini",
+    output_type=CondensedFacts,
+)
+
+
+@dataclass
+class EvidencePack:
+    """ The writer's input: deduplicated facts grouped under the search they first came from """
+    labels: list[str]
+    facts: list[Fact]
+    raw_tokens: int = 0
+    rounds: int = 0
+    dropped: int = 0
+
+    def render(self) -> str:
+        groups: dict[int, list[Fact]] = {}
+        for fact in self.facts:
+            groups.setdefault(fact.sources[0], []).append(fact)
+        parts = [f"Evidence from {len(self.labels)} searches; the numbers in brackets are the searches that reported each fact."]
+        for source in sorted(groups):
+            parts.append(f"\n### [{source}] {self.labels[source - 1]}\n{render(groups[source])}")
+        return "\n".join(parts)
+
+    def stats(self) -> dict:
+        return {"searches": len(self.labels), "facts": len(self.facts), "raw_tokens": self.raw_tokens,
+                "pack_tokens": count_tokens(self.render()), "merge_rounds": self.rounds, "dropped_facts": self.dropped}
+
+
+def chunks(facts: list[Fact], budget: int) -> list[list[Fact]]:
+    """ Consecutive runs of facts of at most `budget` tokens each """
+    groups, current, size = [], [], 0
+    for fact in facts:
+        tokens = count_tokens(fact.text) + 4
+        if current and size + tokens > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(fact)
+        size += tokens
+    return groups + [current] if current else groups
+
+
+def condense_input(query: str, facts: list[Fact]) -> str:
+    return f"Research query: {query}\n\nFacts:\n{render(facts)}"
+
+
+def condensed_facts(output: CondensedFacts, facts: list[Fact]) -> list[Fact]:
+    """ Facts from condense_agent's output, keeping only source numbers that were in its input """
+    known = {source for fact in facts for source in fact.sources}
+    condensed = []
+    for item in output.facts:
+        sources = sorted(set(item.sources) & known) or sorted(known)[:1]
+        condensed.append(Fact(item.text, sources))
+    return condensed
+
+
+async def build_evidence_pack(summaries: list[str], labels: list[str] | None = None,
+                              budget: int | None = None, chunk_budget: int | None = None, max_rounds: int = 3,
+                              condense: Callable[[list[Fact]], Awaitable[list[Fact]]] | None = None) -> EvidencePack:
+    """ Split the summaries into facts, merge duplicates, then condense chunks in a merge tree until the pack fits `budget` tokens
+
+    Nothing is sent to a model while the deduplicated facts already fit, which covers normal plans.
+    `condense` turns one chunk of facts into fewer facts, normally by running condense_agent on
+    condense_input() and reading its output with condensed_facts(). Each round condenses chunks of
+    `chunk_budget` tokens in parallel and dedupes the result again, so the number of rounds grows
+    with the log of the input size. If the pack still does not fit after `max_rounds`, the facts
+    reported by the fewest searches are dropped.
+    """
+    budget = budget or int(os.getenv("EVIDENCE_TOKEN_BUDGET", "6000"))
+    chunk_budget = chunk_budget or int(os.getenv("EVIDENCE_CHUNK_BUDGET", "3000"))
+    labels = labels or [f"Search {i}" for i in range(1, len(summaries) + 1)]
+    facts = [fact for i, summary in enumerate(summaries, 1) for fact in split_facts(summary, i)]
+    pack = EvidencePack(labels, dedupe(facts), raw_tokens=count_tokens(str(summaries)))
+    while condense is not None and count_tokens(pack.render()) > budget and pack.rounds < max_rounds:
+        before = len(pack.facts)
+        condensed = await asyncio.gather(*(condense(group) for group in chunks(pack.facts, chunk_budget)))
+        pack.facts = dedupe([fact for group in condensed for fact in group])
+        pack.rounds += 1
+        if len(pack.facts) >= before:
+            break
+    if count_tokens(pack.render()) > budget:
+        # Keep well-corroborated facts, in their original order
+        ranked = sorted(range(len(pack.facts)), key=lambda i: (-len(pack.facts[i].sources), i))
+        keep, used = set(), count_tokens(pack.render()) - count_tokens(render(pack.facts))
+        for i in ranked:
+            used += count_tokens(pack.facts[i].text) + 4
+            if used > budget:
+                break
+            keep.add(i)
+        pack.dropped = len(pack.facts) - len(keep)
+        pack.facts = [fact for i, fact in enumerate(pack.facts) if i in keep]
+    return pack
@@ -0,0 +1,72 @@
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+
+@dataclass
+class QuorumPolicy:
+    """ When to stop waiting for slow searches """
+    quorum: float = 0.8  # once this share of searches has finished...
+    grace: float = 5.0  # ...the rest get this many more seconds
+    deadline: float = 90.0  # hard cap on the search phase, in seconds
+
+
+class SectionPipeline:
+    """ Start writing a report section from each search as soon as that search finishes
+
+    Instead of waiting for every search before writing, each finished summary goes straight to
+    write_section, so sections are written while slower searches are still running. Searches
+    still running when the policy says stop are cancelled and left out of the report.
+    """
+
+    def __init__(self, search: Callable[..., Awaitable[str | None]], write_section: Callable[..., Awaitable[str | None]], policy: QuorumPolicy | None = None):
+        self.search = search
+        self.write_section = write_section
+        self.policy = policy or QuorumPolicy()
+        self.completed = 0
+        self.failed = 0
+        self.cut = 0
+
+    async def run(self, items):
+        """ Yield (index of the search item, section markdown) as each section is written """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        needed = math.ceil(self.policy.quorum * len(items))
+        searches = {asyncio.create_task(self.search(item)): i for i, item in enumerate(items)}
+        sections = {}
+        quorum_at = None
+        try:
+            while searches or sections:
+                timeout = None
+                if searches:
+                    stop_at = start + self.policy.deadline
+                    if quorum_at is not None:
+                        stop_at = min(stop_at, quorum_at + self.policy.grace)
+                    timeout = stop_at - loop.time()
+                    if timeout <= 0:
+                        self.cut += len(searches)
+                        for task in searches:
+                            task.cancel()
+                        searches = {}
+                        continue
+                done, _ = await asyncio.wait([*searches, *sections], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task in searches:
+                        i = searches.pop(task)
+                        summary = None if task.exception() else task.result()
+                        if summary is None:
+                            self.failed += 1
+                        else:
+                            self.completed += 1
+                            sections[asyncio.create_task(self.write_section(items[i], summary))] = i
+                        if quorum_at is None and self.completed + self.failed >= needed:
+                            quorum_at = loop.time()
+                    else:
+                        i = sections.pop(task)
+                        section = None if task.exception() else task.result()
+                        if section:
+                            yield i, section
+        finally:
+            for task in [*searches, *sections]:
+                task.cancel()
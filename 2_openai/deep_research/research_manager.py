@@ -1,12 +1,41 @@
-from agents import Runner, trace, gen_trace_id
+from agents import Runner, trace, gen_trace_id, custom_span
+from openai.types.responses import ResponseTextDeltaEvent
 from search_agent import search_agent
 from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
-from writer_agent import writer_agent, ReportData
+from writer_agent import writer_agent, ReportData, stream_writer_agent, visible_report, parse_streamed_report, \
+    section_writer_agent, merge_agent, MergedReport, assemble_report
+from pipeline import SectionPipeline, QuorumPolicy
+from search_cache import search_cache
+from evidence import build_evidence_pack, condense_agent, condense_input, condensed_facts, CondensedFacts
 from email_agent import email_agent
+from pathlib import Path
 import asyncio
+import os
+import sys
+import time
+
+# shared call scheduler from 2_openai/call_scheduler.py
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from call_scheduler import scheduler, run_all, model_key, INTERACTIVE
 
 class ResearchManager:
 
+    def __init__(self, stream_report: bool = True, pipelined: bool = False, policy: QuorumPolicy | None = None, use_search_cache: bool | None = None,
+                 priority: int = INTERACTIVE):
+        # Stream the report into the UI as it is written instead of showing it only when complete
+        self.stream_report = stream_report
+        # Write a section per search as soon as it finishes, cut off slow searches by `policy`, then merge
+        self.pipelined = pipelined
+        self.policy = policy or QuorumPolicy()
+        # Reuse search summaries from recent runs; pass False (or set SEARCH_CACHE=off) for freshness-critical research
+        if use_search_cache is None:
+            use_search_cache = os.getenv("SEARCH_CACHE", "on") != "off"
+        self.search_cache = search_cache if use_search_cache else None
+        # Every agent call goes through the shared scheduler; BATCH runs yield to people waiting on the UI
+        self.priority = priority
+        self.failed_searches = []
+        self.search_queries = []
+
     async def run(self, query: str):
         """ Run the deep research process, yielding the status updates and the final report"""
         trace_id = gen_trace_id()
@@ -15,70 +44,161 @@ class ResearchManager:
             yield f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}"
             print("Starting research...")
             search_plan = await self.plan_searches(query)
+            if self.pipelined:
+                yield "Searches planned, searching and writing sections..."
+                async for update in self.run_pipelined(query, search_plan):
+                    report = update
+                    yield update if isinstance(update, str) else f"{update.markdown_report}\n\n---\n*Report written, sending email...*"
+                await self.send_email(report)
+                yield report.markdown_report
+                return
             yield "Searches planned, starting to search..."     
             search_results = await self.perform_searches(search_plan)
-            yield "Searches complete, writing report..."
-            report = await self.write_report(query, search_results)
-            yield "Report written, sending email..."
+            if self.failed_searches:
+                yield f"Searches complete ({len(self.failed_searches)} of {len(search_plan.searches)} failed), writing report..."
+            else:
+                yield "Searches complete, writing report..."
+            if self.stream_report:
+                async for partial, report in self.write_report_streamed(query, search_results, self.search_queries):
+                    yield partial
+                yield f"{report.markdown_report}\n\n---\n*Report written, sending email...*"
+            else:
+                report = await self.write_report(query, search_results, self.search_queries)
+                yield "Report written, sending email..."
             await self.send_email(report)
-            yield "Email sent, research complete"
+            if not self.stream_report:
+                yield "Email sent, research complete"
             yield report.markdown_report
         
 
     async def plan_searches(self, query: str) -> WebSearchPlan:
         """ Plan the searches to perform for the query """
         print("Planning searches...")
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             planner_agent,
             f"Query: {query}",
+            priority=self.priority,
         )
         print(f"Will perform {len(result.final_output.searches)} searches")
         return result.final_output_as(WebSearchPlan)
 
     async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
-        """ Perform the searches to perform for the query """
+        """ Perform the searches to perform for the query, recording the ones that fail in self.failed_searches """
         print("Searching...")
-        num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
-        results = []
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if result is not None:
-                results.append(result)
-            num_completed += 1
-            print(f"Searching... {num_completed}/{len(tasks)} completed")
-        print("Finished searching")
-        return results
+        async def labelled(item):
+            return item.query, await self.search(item)
+        results, self.failed_searches = await run_all(labelled, search_plan.searches)
+        print(f"Finished searching, {len(self.failed_searches)} failed")
+        self.search_queries = [query for query, _ in results]
+        return [summary for _, summary in results]
 
-    async def search(self, item: WebSearchItem) -> str | None:
-        """ Perform a search for the query """
+    async def search(self, item: WebSearchItem) -> str:
+        """ Perform a search for the query, or reuse a cached summary of the same search; raises if the search fails """
+        if self.search_cache is not None:
+            with custom_span("search cache", data={"query": item.query}) as span:
+                # SQLite under a lock: keep it off the event loop while other searches are in flight
+                summary, matched = await asyncio.to_thread(self.search_cache.get, item.query)
+                span.span_data.data.update(hit=summary is not None, matched=matched, **self.search_cache.stats())
+            if summary is not None:
+                return summary
         input = f"Search term: {item.query}\nReason for searching: {item.reason}"
-        try:
-            result = await Runner.run(
-                search_agent,
-                input,
-            )
-            return str(result.final_output)
-        except Exception:
-            return None
+        result = await scheduler.run_agent(
+            search_agent,
+            input,
+            priority=self.priority,
+        )
+        summary = str(result.final_output)
+        if self.search_cache is not None:
+            await asyncio.to_thread(self.search_cache.put, item.query, summary)
+        return summary
 
-    async def write_report(self, query: str, search_results: list[str]) -> ReportData:
+    async def build_evidence(self, query: str, search_results: list[str], queries: list[str] | None = None) -> str:
+        """ Deduplicated, token-budgeted evidence from the search summaries, for the writer """
+        async def condense(facts):
+            result = await scheduler.run_agent(condense_agent, condense_input(query, facts), priority=self.priority)
+            return condensed_facts(result.final_output_as(CondensedFacts), facts)
+        with custom_span("evidence pack", data={}) as span:
+            pack = await build_evidence_pack(search_results, queries, condense=condense)
+            span.span_data.data.update(pack.stats())
+        stats = pack.stats()
+        print(f"Evidence pack: {stats['facts']} facts, ~{stats['pack_tokens']} tokens from ~{stats['raw_tokens']}, {stats['merge_rounds']} merge rounds")
+        return pack.render()
+
+    async def write_report(self, query: str, search_results: list[str], queries: list[str] | None = None) -> ReportData:
         """ Write the report for the query """
         print("Thinking about report...")
-        input = f"Original query: {query}\nSummarized search results: {search_results}"
-        result = await Runner.run(
+        input = f"Original query: {query}\n\n{await self.build_evidence(query, search_results, queries)}"
+        result = await scheduler.run_agent(
             writer_agent,
             input,
+            priority=self.priority,
         )
 
         print("Finished writing report")
         return result.final_output_as(ReportData)
     
+    async def write_report_streamed(self, query: str, search_results: list[str], queries: list[str] | None = None):
+        """ Write the report, yielding (markdown so far, None) as it streams and finally (report, ReportData) """
+        print("Thinking about report (streaming)...")
+        input = f"Original query: {query}\n\n{await self.build_evidence(query, search_results, queries)}"
+        text, last_yield = "", 0.0
+        # A stream can't be replayed, so it only takes a slot from the scheduler and is not retried
+        async with scheduler.slot(model_key(stream_writer_agent), self.priority):
+            result = Runner.run_streamed(
+                stream_writer_agent,
+                input,
+            )
+            async for event in result.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    text += event.data.delta
+                    # Each yield re-sends the whole markdown to the browser, so cap it at ~10 updates a second
+                    if time.monotonic() - last_yield >= 0.1:
+                        last_yield = time.monotonic()
+                        yield visible_report(text), None
+        report = parse_streamed_report(text)
+        print("Finished writing report")
+        yield report.markdown_report, report
+
+    async def run_pipelined(self, query: str, search_plan: WebSearchPlan):
+        """ Yield the sections written so far as markdown, then the merged ReportData """
+        pipeline = SectionPipeline(self.search, lambda item, summary: self.write_section(query, item, summary), self.policy)
+        sections = {}
+        async for index, section in pipeline.run(search_plan.searches):
+            sections[index] = section
+            yield "\n\n".join(sections[i] for i in sorted(sections)) + f"\n\n---\n*{len(sections)} sections written...*"
+        print(f"Searches: {pipeline.completed} used, {pipeline.failed} failed, {pipeline.cut} cut off by the deadline")
+        yield await self.merge_sections(query, [sections[i] for i in sorted(sections)])
+
+    async def write_section(self, query: str, item: WebSearchItem, summary: str) -> str | None:
+        """ Write one report section from one search summary """
+        input = f"Original query: {query}\nSearch term: {item.query}\nReason for searching: {item.reason}\nSearch results summary: {summary}"
+        try:
+            result = await scheduler.run_agent(
+                section_writer_agent,
+                input,
+                priority=self.priority,
+            )
+            return str(result.final_output)
+        except Exception:
+            return None
+
+    async def merge_sections(self, query: str, sections: list[str]) -> ReportData:
+        """ Add a title, introduction and conclusion around the sections """
+        print("Merging sections...")
+        input = f"Original query: {query}\n\nSections:\n\n" + "\n\n".join(sections)
+        result = await scheduler.run_agent(
+            merge_agent,
+            input,
+            priority=self.priority,
+        )
+        return assemble_report(result.final_output_as(MergedReport), sections)
+
     async def send_email(self, report: ReportData) -> None:
         print("Writing email...")
-        result = await Runner.run(
+        result = await scheduler.run_agent(
             email_agent,
             report.markdown_report,
+            priority=self.priority,
         )
         print("Email sent")
         return report
\ No newline at end of file
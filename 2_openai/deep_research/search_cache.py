@@ -0,0 +1,95 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+STOPWORDS = {"a", "an", "the", "of", "for", "in", "on", "to", "and", "or", "with", "about", "is", "are", "what", "how", "vs", "versus"}
+
+
+def normalize_query(query: str) -> str:
+    """ Lowercase, drop punctuation and filler words, sort the rest: "The latest AI agents?" -> "agents ai latest" """
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    return " ".join(sorted({w for w in words if w not in STOPWORDS}))
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+class SearchCache:
+    """ Search summaries in SQLite, keyed by normalized query within a date bucket
+
+    A summary is reused only within the same bucket (one UTC day by default) and for at most `ttl`
+    seconds, so results never go staler than the caller allows. The table is capped at
+    `max_entries`, evicting the least recently used. With `similarity` set, a query that misses
+    exactly can still hit a cached query from the same bucket whose word overlap is at least that.
+    """
+
+    def __init__(self, path=".cache/search_cache.db", ttl=24 * 3600, max_entries=2000, bucket="%Y-%m-%d", similarity=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bucket_format = bucket
+        self.similarity = similarity
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS searches (bucket TEXT, query TEXT, summary TEXT,
+            created REAL, used REAL, PRIMARY KEY (bucket, query))""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS searches_used ON searches (used)")
+        self.conn.commit()
+
+    @classmethod
+    def from_env(cls):
+        similarity = os.getenv("SEARCH_CACHE_SIMILARITY")
+        return cls(
+            path=os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.db"),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600))),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000")),
+            similarity=float(similarity) if similarity else None,
+        )
+
+    def bucket(self) -> str:
+        return datetime.now(timezone.utc).strftime(self.bucket_format)
+
+    def get(self, query: str) -> tuple[str | None, str | None]:
+        """ Return (summary, matched normalized query), or (None, None) on a miss """
+        key, bucket, now = normalize_query(query), self.bucket(), time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT query, summary FROM searches WHERE bucket = ? AND query = ? AND created >= ?",
+                                    (bucket, key, now - self.ttl)).fetchone()
+            if row is None and self.similarity is not None:
+                candidates = self.conn.execute("SELECT query, summary FROM searches WHERE bucket = ? AND created >= ?",
+                                               (bucket, now - self.ttl)).fetchall()
+                scored = [(jaccard(key, q), q, s) for q, s in candidates]
+                best = max(scored, default=None)
+                if best and best[0] >= self.similarity:
+                    row = best[1:]
+            if row is None:
+                self.misses += 1
+                return None, None
+            self.hits += 1
+            with self.conn:
+                self.conn.execute("UPDATE searches SET used = ? WHERE bucket = ? AND query = ?", (now, bucket, row[0]))
+            return row[1], row[0]
+
+    def put(self, query: str, summary: str) -> None:
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?)", (self.bucket(), normalize_query(query), summary, now, now))
+            self.conn.execute("DELETE FROM searches WHERE created < ?", (now - self.ttl,))
+            self.conn.execute("""DELETE FROM searches WHERE rowid IN (SELECT rowid FROM searches ORDER BY used DESC LIMIT -1 OFFSET ?)""",
+                              (self.max_entries,))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+# One cache per process, shared by every ResearchManager so the hit rate covers all runs
+search_cache = SearchCache.from_env()
@@ -7,7 +7,9 @@ INSTRUCTIONS = (
     "You should first come up with an outline for the report that describes the structure and "
     "flow of the report. Then, generate the report and return that as your final output.\n"
     "The final output should be in markdown format, and it should be lengthy and detailed. Aim "
-    "for 5-10 pages of content, at least 1000 words."
+    "for 5-10 pages of content, at least 1000 words.\n"
+    "The research comes as facts grouped by search, each followed by the numbers of the searches that "
+    "reported it; a fact reported by several searches is better corroborated."
 )
 
 
@@ -24,4 +26,98 @@ writer_agent = Agent(
     instructions=INSTRUCTIONS,
     model="gpt-4o-mini",
     output_type=ReportData,
-)
\ No newline at end of file
+)
+
+# Streaming variant: plain markdown so the report can be shown while it is written, with the
+# summary and follow-up questions in a tail after SUMMARY_MARKER that is parsed at the end
+SUMMARY_MARKER = "<!-- SUMMARY -->"
+FOLLOW_UP_MARKER = "<!-- FOLLOW-UP -->"
+
+STREAM_INSTRUCTIONS = INSTRUCTIONS.replace(
+    "Then, generate the report and return that as your final output.",
+    "Then, write the report in markdown, starting directly with the report itself (do not print the outline).",
+) + (
+    f"\nAfter the report, output a line containing only {SUMMARY_MARKER}, then a short 2-3 sentence summary "
+    f"of the findings, then a line containing only {FOLLOW_UP_MARKER}, then 3-5 suggested topics to research "
+    "further as a markdown bullet list. Output nothing after the list."
+)
+
+stream_writer_agent = Agent(
+    name="StreamingWriterAgent",
+    instructions=STREAM_INSTRUCTIONS,
+    model="gpt-4o-mini",
+)
+
+
+def visible_report(text: str) -> str:
+    """ The part of a partially streamed output that belongs to the report, without a half-written marker """
+    end = text.find(SUMMARY_MARKER)
+    if end != -1:
+        return text[:end].rstrip()
+    # Hold back a trailing prefix of the marker until we know whether it is one
+    for size in range(len(SUMMARY_MARKER) - 1, 0, -1):
+        if text.endswith(SUMMARY_MARKER[:size]):
+            return text[:-size]
+    return text
+
+
+def parse_streamed_report(text: str) -> ReportData:
+    """ Split the streamed output into ReportData; a missing tail leaves summary and questions empty """
+    report, _, tail = text.partition(SUMMARY_MARKER)
+    summary, _, follow_up = tail.partition(FOLLOW_UP_MARKER)
+    questions = [line.strip().lstrip("-*•").strip() for line in follow_up.splitlines()]
+    return ReportData(
+        short_summary=summary.strip(),
+        markdown_report=report.strip(),
+        follow_up_questions=[q for q in questions if q],
+    )
+
+
+# Pipelined variant: one section per search, written as soon as that search finishes, then a
+# short merge pass that adds the framing around the sections instead of rewriting them
+SECTION_INSTRUCTIONS = (
+    "You are a senior researcher writing one section of a larger report for a research query. "
+    "You will be given the original query, one search term with the reason it was searched, and a summary "
+    "of the search results. Write a detailed markdown section of 200-400 words covering what these results "
+    "contribute to answering the query. Start with a '## ' heading naming the section's topic. Do not write "
+    "an introduction or conclusion for the whole report."
+)
+
+section_writer_agent = Agent(
+    name="SectionWriterAgent",
+    instructions=SECTION_INSTRUCTIONS,
+    model="gpt-4o-mini",
+)
+
+
+class MergedReport(BaseModel):
+    title: str = Field(description="A title for the full report.")
+
+    introduction: str = Field(description="A markdown introduction of 1-3 paragraphs framing the sections.")
+
+    conclusion: str = Field(description="A markdown conclusion of 1-3 paragraphs drawing the sections together.")
+
+    short_summary: str = Field(description="A short 2-3 sentence summary of the findings.")
+
+    follow_up_questions: list[str] = Field(description="Suggested topics to research further")
+
+
+MERGE_INSTRUCTIONS = (
+    "You are a senior researcher assembling a report from sections already written by colleagues. "
+    "You will be given the original query and the sections. Do not rewrite the sections. Write a title, "
+    "an introduction that frames them, a conclusion that draws them together and answers the query, "
+    "a short summary and follow-up questions."
+)
+
+merge_agent = Agent(
+    name="MergeAgent",
+    instructions=MERGE_INSTRUCTIONS,
+    model="gpt-4o-mini",
+    output_type=MergedReport,
+)
+
+
+def assemble_report(merged: MergedReport, sections: list[str]) -> ReportData:
+    body = "\n\n".join(section.strip() for section in sections)
+    markdown = f"# {merged.title}\n\n{merged.introduction.strip()}\n\n{body}\n\n## Conclusion\n\n{merged.conclusion.strip()}"
+    return ReportData(short_summary=merged.short_summary, markdown_report=markdown, follow_up_questions=merged.follow_up_questions)